@@ -9,10 +9,23 @@ from langchain_openai import ChatOpenAI
 from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.pydantic_v1 import BaseModel, Field
+import bisect
+import hashlib
+import heapq
+import json
+import math
 import operator
 import os
+import random
 import re
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 
 # PDF 생성 라이브러리
@@ -417,6 +430,70 @@ class ResearchPlan(BaseModel):
     challenge: ResearchArea
 
 
+# ==================== 종합 인사이트 구조 ====================
+SYNTHESIS_OUTPUT_MODE = os.getenv("SYNTHESIS_OUTPUT_MODE", "structured")  # "structured": Insight JSON, "text": 자유 서술
+REPORT_SECTION_KEYS = [
+    "executive_summary", "market_overview", "technology_trends", "industry_applications",
+    "key_players", "challenges", "forecast", "recommendations", "conclusion",
+]
+# 인사이트에 sections 태그가 없을 때 사용하는 카테고리 -> 섹션 기본 매핑 (None: 전체 카테고리)
+SECTION_INSIGHT_CATEGORIES: Dict[str, Optional[List[str]]] = {
+    "executive_summary": None,
+    "market_overview": ["market"],
+    "technology_trends": ["tech"],
+    "industry_applications": ["industry"],
+    "key_players": ["company"],
+    "challenges": ["challenge"],
+    "forecast": ["market", "tech"],
+    "recommendations": None,
+    "conclusion": None,
+}
+
+
+class Insight(BaseModel):
+    """카테고리 종합에서 추출한 인사이트 하나"""
+    claim: str = Field(..., description="핵심 주장 한 문장")
+    figures: List[str] = Field(default_factory=list, description="주장을 뒷받침하는 수치 (값+단위+연도, 예: '$38.1B (2030)', 'CAGR 32.5% (2025-2030)')")
+    entities: List[str] = Field(default_factory=list, description="관련 기업/제품/프로젝트명")
+    sources: List[str] = Field(default_factory=list, description="근거 URL 또는 출처명")
+    sections: List[str] = Field(default_factory=list, description=f"이 인사이트를 쓸 보고서 섹션 키 ({', '.join(REPORT_SECTION_KEYS)})")
+
+
+class CategoryInsights(BaseModel):
+    """카테고리 하나의 구조화된 종합 결과"""
+    summary: str = Field(..., description="카테고리 전체 요약 1-2문장")
+    insights: List[Insight] = Field(..., description="중요도 순 핵심 인사이트 3-5개")
+
+
+def serialize_insights(
+    synthesized: Dict[str, Any],
+    section: Optional[str] = None,
+    fields: tuple = ("claim", "figures", "entities", "sources"),
+) -> str:
+    """synthesized_data를 필요한 필드만 담은 압축 텍스트로 직렬화. section을 주면 해당 섹션 인사이트만"""
+    default_categories = SECTION_INSIGHT_CATEGORIES.get(section) if section else None
+    lines: List[str] = []
+    for category, data in synthesized.items():
+        if not isinstance(data, dict):
+            # text 모드 또는 구조화 실패로 자유 서술이 저장된 카테고리
+            if section is None or default_categories is None or category in default_categories:
+                lines.append(f"[{category}] {data}")
+            continue
+        in_default = section is None or default_categories is None or category in default_categories
+        if in_default and data.get("summary"):
+            lines.append(f"[{category}] 요약: {data['summary']}")
+        for insight in data.get("insights", []):
+            if section is not None and section not in insight.get("sections", []) and not in_default:
+                continue
+            parts = [insight.get("claim", "")] if "claim" in fields else []
+            labels = {"figures": "수치", "entities": "기업/제품", "sources": "출처"}
+            for field in ("figures", "entities", "sources"):
+                if field in fields and insight.get(field):
+                    parts.append(f"{labels[field]}: {'; '.join(insight[field])}")
+            lines.append(f"[{category}] " + " | ".join(part for part in parts if part))
+    return "\n".join(lines)
+
+
 DEFAULT_RESEARCH_PLAN: Dict[str, List[str]] = {
     "market": [
         "Physical AI market size 2025-2030",
@@ -626,13 +703,31 @@ E. 전문성 (20점)
 ])
 
 # ==================== Tavily 검색 설정 ====================
-def get_tavily_search(max_results: int = 5):
+SEARCH_DEPTH_MODE = "tiered"  # "advanced": 항상 advanced 검색, "tiered": basic 우선 후 필요 시 advanced 승격
+SEARCH_DEPTH_CREDITS = {"basic": 1, "advanced": 2}  # Tavily 호출당 크레딧
+ADVANCED_LATENCY_ESTIMATE_SEC = 4.0  # advanced 실측값이 없을 때 사용하는 추정 지연시간
+
+# 검색 예산 (0 = 제한 없음). 단위는 "credits"(Tavily 크레딧) 또는 "queries"(API 호출 수)
+SEARCH_BUDGET = int(os.getenv("SEARCH_BUDGET", "0"))
+SEARCH_BUDGET_UNIT = os.getenv("SEARCH_BUDGET_UNIT", "credits")
+LATENCY_TARGET_SEC = float(os.getenv("LATENCY_TARGET_SEC", "0"))  # 리서치 단계 목표 시간 (0 = 제한 없음)
+CATEGORY_IMPORTANCE = {"market": 1.2, "tech": 1.2, "industry": 1.0, "company": 1.0, "challenge": 0.8}
+
+
+def search_cost(depth: str) -> int:
+    """SEARCH_BUDGET_UNIT 기준 Tavily 호출 1회 비용"""
+    return SEARCH_DEPTH_CREDITS[depth] if SEARCH_BUDGET_UNIT == "credits" else 1
+
+# 원문(raw content) 모드: 페이지 원문에서 질의 관련 구간만 로컬로 추출해 보관 (opt-in)
+INCLUDE_RAW_CONTENT = os.getenv("INCLUDE_RAW_CONTENT", "0") == "1"
+
+def get_tavily_search(max_results: int = 5, search_depth: str = "advanced"):
     """Tavily 검색 도구 생성"""
     return TavilySearchResults(
         max_results=max_results,
-        search_depth="advanced",  # "basic" or "advanced"
+        search_depth=search_depth,  # "basic" or "advanced"
         include_answer=True,  # AI 생성 답변 포함
-        include_raw_content=False,  # only summary text to keep logs small
+        include_raw_content=INCLUDE_RAW_CONTENT,  # 기본은 요약 텍스트만 (로그/메모리 절약)
         include_images=False
     )
 
@@ -666,6 +761,13 @@ def merge_report_sections(existing: Optional[Dict[str, str]], new: Dict[str, str
     return merged
 
 
+def merge_research_data(existing: Optional[Dict[str, List[Dict]]], new: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """Merge per-category research results keyed by category name."""
+    merged = dict(existing) if existing else {}
+    merged.update(new or {})
+    return merged
+
+
 def merge_synthesized_data(existing: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
     """Merge synthesized insights coming from multiple nodes."""
     merged = dict(existing) if existing else {}
@@ -686,6 +788,14 @@ def replace_iteration_count(existing: Optional[int], new: int) -> int:
     new_val = new if new is not None else 0
     return max(existing_val, new_val)
 
+def replace_score_history(existing: Optional[List[float]], new: List[float]) -> List[float]:
+    """Prefer the latest review score history."""
+    return list(new) if new is not None else list(existing or [])
+
+def replace_best_draft(existing: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Prefer the latest best-scoring draft snapshot."""
+    return dict(new) if new is not None else dict(existing or {})
+
 # ==================== State 정의 ====================
 class AgentState(TypedDict):
     """에이전트 상태 관리"""
@@ -696,44 +806,257 @@ class AgentState(TypedDict):
     industry_data: Annotated[List[Dict], replace_result_list]
     company_data: Annotated[List[Dict], replace_result_list]
     challenge_data: Annotated[List[Dict], replace_result_list]
+    research_data: Annotated[Dict[str, List[Dict]], merge_research_data]  # 등록된 전체 카테고리 결과
     synthesized_data: Annotated[Dict[str, Any], merge_synthesized_data]
     report_sections: Annotated[Dict[str, str], merge_report_sections]
     final_report: Annotated[str, replace_final_report]
     quality_score: Annotated[float, replace_quality_score]
-    iteration_count: Annotated[int, replace_iteration_count]
+    iteration_count: Annotated[int, replace_iteration_count]  # 리서치 루프 전용
+    refine_count: Annotated[int, replace_iteration_count]  # 리뷰/개선 루프 횟수
+    score_history: Annotated[List[float], replace_score_history]  # 리뷰 점수 이력
+    best_draft: Annotated[Dict[str, Any], replace_best_draft]  # 최고 점수 보고서 스냅샷
     search_context: Annotated[Dict[str, str], merge_search_context]  # Tavily 답변 저장
     messages: Annotated[List[str], operator.add]
 
 
-def execute_tavily_query(tavily_search, query: str) -> Dict[str, Any]:
-    """Run Tavily with fallbacks to avoid empty responses."""
-    # ✅ 단순화된 시도 목록 (문자열만)
-    attempts = [
-        query,  # 원본 쿼리
-        f"{query} 2024 2025",  # 연도 추가
-        f"{query} analysis",  # 영어 키워드 추가
-    ]
+# ==================== 검색 이력 통계 ====================
+# 학습/캐시 파일 기본 이름 접두어: 두 에이전트가 같은 카테고리 이름을 쓰므로 통계/캐시/보정값이 섞이지 않도록 분리
+STATE_FILE_PREFIX = "physical_ai_"
+SEARCH_STATS_PATH = os.getenv("SEARCH_STATS_PATH", f"{STATE_FILE_PREFIX}search_stats.json")
+VARIANT_POLICY_ENABLED = True  # 과거 성과 기반으로 쿼리 변형 순서 결정
+UCB_EXPLORATION = 0.5  # UCB 탐색 가중치 (클수록 덜 시도한 변형을 더 자주 선택)
+MAX_QUERY_MODIFIERS = 2  # strengthen_keyword가 붙이는 최대 보강 문구 수
+KEYWORD_PRIORITY_ENABLED = True  # 키워드 패턴별 과거 수율 순으로 검색 실행
+KEYWORD_YIELD_SMOOTHING = 2.0  # 관측이 적은 패턴을 카테고리 평균 쪽으로 당기는 가중치
+KEYWORD_PATTERN_STOPWORDS = {"a", "an", "and", "the", "of", "for", "in", "on", "to", "vs", "with"}
+
+# 쿼리 변형: 이름 -> (템플릿, 사전 기대 보상). 사전값은 이력이 없을 때 기존 순서를 유지한다.
+QUERY_VARIANTS: Dict[str, tuple] = {
+    "raw": ("{query}", 0.6),
+    "recent": ("{query} 2024 2025", 0.5),
+    "analysis": ("{query} analysis", 0.4),
+}
+
+# 품질 보강 문구: 이름 -> (대상 품질 이슈, 문구, 사전 기대 보상)
+QUERY_MODIFIERS: Dict[str, tuple] = {
+    "coverage": (("items", "coverage"), "comprehensive data reliable sources 2024", 0.5),
+    "answers": (("answers",), "key insights summary", 0.5),
+    "content": (("content",), "detailed report in depth analysis", 0.5),
+    "score": (("score",), "official statistics verified figures", 0.5),
+}
+
+
+def search_outcome(raw_results: Dict[str, Any]) -> Dict[str, float]:
+    """Tavily 응답 하나를 hit / 평균 score / 답변 여부 / 보상으로 요약"""
+    results_list = raw_results.get("results") or []
+    if isinstance(results_list, dict):
+        results_list = [results_list]
+    results_list = [result for result in results_list if isinstance(result, dict)]
+    hit = 1.0 if results_list else 0.0
+    avg_score = (
+        sum(float(result.get("score") or 0.0) for result in results_list) / len(results_list)
+        if results_list else 0.0
+    )
+    answer = 1.0 if raw_results.get("answer") else 0.0
+    reward = hit * (0.5 + 0.3 * min(avg_score, 1.0) + 0.2 * answer)
+    return {"hit": hit, "score": avg_score, "answer": answer, "reward": reward}
+
+
+class SearchStatsStore:
+    """카테고리별 검색 성과 통계를 로컬 JSON 파일에 누적"""
+
+    def __init__(self, path: str = SEARCH_STATS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data: Dict[str, Any] = self._load()
+        self.dirty = False  # record()는 메모리만 갱신하고 flush()에서 한 번에 저장
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            return loaded if isinstance(loaded, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def flush(self) -> None:
+        """변경분이 있을 때만 파일에 저장 (병렬 검색이 디스크 I/O로 직렬화되지 않도록 실행 단위로 호출)"""
+        with self._lock:
+            if not self.dirty:
+                return
+            payload = json.dumps(self.data, ensure_ascii=False, indent=1)
+            self.dirty = False
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            print(f"⚠️ 검색 통계 저장 실패: {exc}")
+
+    def record(self, section: str, category: str, name: str, outcome: Dict[str, float]) -> None:
+        """arm(변형/수정어 등) 하나의 결과 값들을 합산 누적 (저장은 flush에서)"""
+        with self._lock:
+            arm = self.data.setdefault(section, {}).setdefault(category, {}).setdefault(name, {"trials": 0})
+            arm["trials"] += 1
+            for key, value in outcome.items():
+                arm[key] = arm.get(key, 0.0) + value
+            self.dirty = True
+
+    def record_many(self, section: str, category: str, outcomes: List[tuple]) -> None:
+        """(name, outcome) 여러 건을 한 번에 누적 (저장은 flush에서)"""
+        if not outcomes:
+            return
+        with self._lock:
+            arms = self.data.setdefault(section, {}).setdefault(category, {})
+            for name, outcome in outcomes:
+                arm = arms.setdefault(name, {"trials": 0})
+                arm["trials"] += 1
+                for key, value in outcome.items():
+                    arm[key] = arm.get(key, 0.0) + value
+            self.dirty = True
+
+    def get(self, section: str, category: str, name: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self.data.get(section, {}).get(category, {}).get(name, {}))
+
+    def mean(self, section: str, category: str, name: str, key: str, default: float) -> float:
+        """누적값의 시행당 평균 (이력이 없으면 default)"""
+        arm = self.get(section, category, name)
+        if not arm.get("trials"):
+            return default
+        return arm.get(key, 0.0) / arm["trials"]
+
+    def rank(self, section: str, category: str, priors: Dict[str, float]) -> List[str]:
+        """사전 보상을 1회 관측으로 간주한 UCB1 점수 순으로 arm 정렬"""
+        with self._lock:
+            arms = self.data.get(section, {}).get(category, {})
+            total = sum(arms.get(name, {}).get("trials", 0) + 1 for name in priors)
+            scores = {}
+            for name, prior in priors.items():
+                arm = arms.get(name, {})
+                trials = arm.get("trials", 0) + 1
+                mean = (arm.get("reward", 0.0) + prior) / trials
+                scores[name] = mean + UCB_EXPLORATION * math.sqrt(2 * math.log(total) / trials)
+        order = list(priors)
+        return sorted(order, key=lambda name: (-scores[name], order.index(name)))
+
+
+SEARCH_STATS = SearchStatsStore()
+
+
+def ordered_query_variants(query: str, category: Optional[str] = None) -> List[tuple]:
+    """카테고리 이력에 따라 (변형 이름, 쿼리) 목록을 성공 가능성이 높은 순으로 반환"""
+    names = list(QUERY_VARIANTS)
+    if category and VARIANT_POLICY_ENABLED:
+        names = SEARCH_STATS.rank("variants", category, {name: QUERY_VARIANTS[name][1] for name in names})
+    return [(name, QUERY_VARIANTS[name][0].format(query=query)) for name in names]
+
+
+def record_query_outcome(category: Optional[str], variant: str, query: str, raw_results: Dict[str, Any]) -> None:
+    """변형과 쿼리에 포함된 보강 문구의 성과를 기록"""
+    if not category:
+        return
+    outcome = search_outcome(raw_results)
+    SEARCH_STATS.record("variants", category, variant, outcome)
+    for name, (_, phrase, _) in QUERY_MODIFIERS.items():
+        if phrase in query:
+            SEARCH_STATS.record("modifiers", category, name, outcome)
+
+
+def keyword_pattern(keyword: str) -> str:
+    """연도/숫자/불용어를 제거하고 정렬한 토큰으로 키워드 패턴 생성"""
+    tokens = re.findall(r"[a-z][a-z\-]+|[가-힣]+", keyword.lower())
+    return " ".join(sorted({token for token in tokens if token not in KEYWORD_PATTERN_STOPWORDS}))
+
+
+def record_keyword_yield(category: str, keyword: str, entry: Dict[str, Any]) -> None:
+    """키워드 패턴의 결과 수율(score, hit, 답변)을 기록"""
+    pattern = keyword_pattern(keyword)
+    if pattern:
+        SEARCH_STATS.record("keywords", category, pattern, search_outcome(entry))
+
+
+def expected_keyword_yield(category: str, keyword: str) -> float:
+    """패턴 이력(없으면 유사 패턴, 카테고리 평균)으로 기대 수율 추정"""
+    patterns = dict(SEARCH_STATS.data.get("keywords", {}).get(category, {}))
+    total_trials = sum(arm.get("trials", 0) for arm in patterns.values())
+    category_mean = (
+        sum(arm.get("reward", 0.0) for arm in patterns.values()) / total_trials if total_trials else 0.5
+    )
+    pattern = keyword_pattern(keyword)
+    arm = patterns.get(pattern)
+    if arm:
+        return (arm["reward"] + KEYWORD_YIELD_SMOOTHING * category_mean) / (arm["trials"] + KEYWORD_YIELD_SMOOTHING)
+
+    tokens = set(pattern.split())
+    weighted, weights = 0.0, 0.0
+    for known, known_arm in patterns.items():
+        known_tokens = set(known.split())
+        similarity = len(tokens & known_tokens) / len(tokens | known_tokens) if tokens | known_tokens else 0.0
+        if similarity >= 0.5 and known_arm.get("trials"):
+            weighted += similarity * known_arm["reward"] / known_arm["trials"]
+            weights += similarity
+    if weights:
+        return (weighted + KEYWORD_YIELD_SMOOTHING * category_mean) / (weights + KEYWORD_YIELD_SMOOTHING)
+    return category_mean
+
+
+def prioritize_keywords(category: str, keywords: List[str]) -> List[str]:
+    """기대 수율이 높은 키워드가 먼저 검색되도록 정렬 (동점은 계획 순서 유지)"""
+    if not KEYWORD_PRIORITY_ENABLED or len(keywords) < 2:
+        return list(keywords)
+    expected = {keyword: expected_keyword_yield(category, keyword) for keyword in keywords}
+    ordered = sorted(keywords, key=lambda keyword: -expected[keyword])
+    if ordered != list(keywords):
+        print(f"📶 {category}: 수율 기반 키워드 순서 - " + ", ".join(f"{k[:30]}({expected[k]:.2f})" for k in ordered))
+    return ordered
+
+
+def execute_tavily_query(
+    tavily_search,
+    query: str,
+    max_attempts: Optional[int] = None,
+    category: Optional[str] = None,
+    reserve: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """Run Tavily with fallbacks to avoid empty responses.
+    reserve()가 주어지면 각 시도 직전에 호출해 거짓이면(예산 부족) 남은 시도를 중단한다."""
+    # ✅ 변형 시도 목록: 카테고리가 주어지면 과거 성과가 좋은 변형부터 시도
+    attempts = ordered_query_variants(query, category)
+    if max_attempts:
+        attempts = attempts[:max_attempts]
     last_error = ""
+    made = 0
 
-    for idx, query_str in enumerate(attempts, 1):
+    for idx, (variant, query_str) in enumerate(attempts, 1):
+        if reserve is not None and not reserve():
+            last_error = last_error or "search budget exhausted"
+            break
+        made = idx
         try:
-            print(f"🔍 시도 {idx}: {query_str[:50]}...")
+            print(f"🔍 시도 {idx} ({variant}): {query_str[:50]}...")
             result = tavily_search.invoke(query_str)  # ✅ 문자열 직접 전달
             #print(f"✅ 성공! 결과 타입: {type(result)}")
             
             # 결과 처리
             if isinstance(result, dict):
+                record_query_outcome(category, variant, query_str, result)
                 if result.get("results"):
                     result.setdefault("answer", "")
                     result.setdefault("error", "")
+                    result["attempts"] = idx
                     return result
                 last_error = result.get("error", "no results")
                 print(f"⚠️ 빈 결과: {last_error}")
                 continue
 
             if isinstance(result, list):
+                wrapped = {"results": result, "answer": "", "error": ""}
+                record_query_outcome(category, variant, query_str, wrapped)
                 if result:
-                    return {"results": result, "answer": "", "error": ""}
+                    wrapped["attempts"] = idx
+                    return wrapped
                 print(f"⚠️ 빈 리스트")
                 continue
                 
@@ -755,7 +1078,377 @@ def execute_tavily_query(tavily_search, query: str) -> Dict[str, Any]:
             
             continue
 
-    return {"results": [], "answer": "", "error": last_error or "empty Tavily response"}
+    return {"results": [], "answer": "", "error": last_error or "empty Tavily response", "attempts": made}
+
+# ==================== 유사 쿼리 캐시 ====================
+SEARCH_CACHE_ENABLED = True
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", f"{STATE_FILE_PREFIX}search_cache.json")
+SEARCH_CACHE_AUDIT_PATH = os.getenv("SEARCH_CACHE_AUDIT_PATH", f"{STATE_FILE_PREFIX}search_cache_audit.jsonl")
+SEARCH_CACHE_SIMILARITY = float(os.getenv("SEARCH_CACHE_SIMILARITY", "0.7"))  # 단어 토큰 Jaccard 재사용 임계값 (주제 토큰이 같을 때만)
+SEARCH_CACHE_TTL_HOURS = 24
+SEARCH_CACHE_MAX_ENTRIES = 500
+
+
+def normalize_query(query: str) -> str:
+    """대소문자/구두점/단어 순서 차이를 없앤 쿼리 정규형"""
+    return " ".join(sorted(re.findall(r"[a-z0-9가-힣]+", query.lower())))
+
+
+# 주제를 바꾸지 않는 일반 수식어 (쿼리 변형/보강 문구 포함). 이 외의 토큰은 주제 토큰으로 보고 정확히 일치해야 재사용
+SEARCH_CACHE_GENERIC_TOKENS = frozenset(
+    {
+        "a", "an", "the", "of", "for", "and", "in", "on", "to", "by", "vs",
+        "size", "forecast", "forecasts", "outlook", "trend", "trends", "analysis", "report", "reports",
+        "overview", "latest", "growth", "statistics", "data", "insights", "summary",
+        "전망", "동향", "분석", "현황", "보고서", "최신", "규모",
+    }
+    | {word for template, _ in QUERY_VARIANTS.values() for word in re.findall(r"[a-z가-힣]+", template.replace("{query}", ""))}
+    | {word for _, phrase, _ in QUERY_MODIFIERS.values() for word in re.findall(r"[a-z가-힣]+", phrase)}
+)
+
+
+def query_signature(normalized: str) -> tuple:
+    """(주제 토큰 집합, 가장 큰 숫자). 주제 토큰이 하나라도 더해지거나 빠지면, 또는 최신 연도/수치가 다르면 다른 쿼리"""
+    tokens = normalized.split()
+    numbers = [int(token) for token in tokens if token.isdigit()]
+    topic = frozenset(token for token in tokens if not token.isdigit() and token not in SEARCH_CACHE_GENERIC_TOKENS)
+    return topic, max(numbers) if numbers else None
+
+
+def query_similarity(query: str, other: str) -> Optional[float]:
+    """정규화 단어 토큰 Jaccard 유사도 (주제 토큰/최신 수치가 다르면 None)"""
+    left, right = normalize_query(query), normalize_query(other)
+    if query_signature(left) != query_signature(right):
+        return None
+    left_tokens, right_tokens = set(left.split()), set(right.split())
+    return len(left_tokens & right_tokens) / max(1, len(left_tokens | right_tokens))
+
+
+# (새 쿼리, 캐시된 쿼리, 재사용 기대값): --check-cache로 매칭 규칙 확인
+SEARCH_CACHE_CHECKS = [
+    ("physical AI market size forecast 2030", "Physical AI market size 2025-2030", True),
+    ("Physical AI Market Size 2025-2030", "physical ai market size 2025 2030", True),
+    ("humanoid robot market size 2025", "humanoid robot market size 2024", False),
+    ("AI market size 2025-2030", "Physical AI market size 2025-2030", False),
+    ("humanoid robotics market forecast", "robotics market forecast", False),
+]
+
+
+def check_query_cache() -> bool:
+    """SEARCH_CACHE_CHECKS의 재사용/미스 판단이 기대와 같은지 출력 (API 호출 없음)"""
+    passed = True
+    for query, cached, expected in SEARCH_CACHE_CHECKS:
+        similarity = query_similarity(query, cached)
+        reused = similarity is not None and similarity >= SEARCH_CACHE_SIMILARITY
+        passed = passed and reused == expected
+        shown = "-" if similarity is None else f"{similarity:.2f}"
+        print(f"{'✅' if reused == expected else '❌'} {'재사용' if reused else '미스'} ({shown}): '{query}' vs '{cached}'")
+    return passed
+
+
+class FuzzyQueryCache:
+    """(주제 토큰, 최신 수치) 버킷 색인 안에서 단어 토큰 Jaccard로 유사 쿼리 검색 결과를 재사용"""
+
+    def __init__(self, path: str = SEARCH_CACHE_PATH, audit_path: str = SEARCH_CACHE_AUDIT_PATH):
+        self.path = path
+        self.audit_path = audit_path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.index: Dict[tuple, set] = {}
+        self.audit_buffer: List[Dict[str, Any]] = []
+        self.dirty = False  # store()는 메모리만 갱신하고 flush()에서 한 번에 저장
+        cutoff = time.time() - SEARCH_CACHE_TTL_HOURS * 3600
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+        except (OSError, ValueError):
+            loaded = {}
+        for key, entry in (loaded if isinstance(loaded, dict) else {}).items():
+            # raw_content는 저장하지 않으므로 raw 모드 항목은 재시작 후 재사용하지 않음
+            if entry.get("stored_at", 0) >= cutoff and entry.get("profile") and not entry["profile"].endswith(":raw"):
+                self._index(key, entry)
+
+    def _index(self, key: str, entry: Dict[str, Any]) -> None:
+        self.entries[key] = entry
+        self.index.setdefault((entry["profile"], query_signature(entry["normalized"])), set()).add(key)
+
+    def lookup(self, query: str, profile: str, category: str = "") -> Optional[Dict[str, Any]]:
+        """같은 검색 설정(profile)에서 임계값 이상으로 가장 유사한 캐시 결과의 사본 (없으면 None). 판단은 감사 로그에 기록"""
+        normalized = normalize_query(query)
+        tokens = set(normalized.split())
+        with self._lock:
+            best_key, best_similarity = None, 0.0
+            for other in self.index.get((profile, query_signature(normalized)), ()):
+                other_tokens = set(self.entries[other]["normalized"].split())
+                similarity = len(tokens & other_tokens) / max(1, len(tokens | other_tokens))
+                if similarity > best_similarity:
+                    best_key, best_similarity = other, similarity
+            reused = best_key is not None and best_similarity >= SEARCH_CACHE_SIMILARITY
+            record = {
+                "time": datetime.now().isoformat(timespec="seconds"),
+                "category": category,
+                "profile": profile,
+                "query": query,
+                "matched_query": self.entries[best_key]["query"] if best_key else None,
+                "similarity": round(best_similarity, 3),
+                "decision": "reuse" if reused else "miss",
+            }
+            self.audit_buffer.append(record)
+            if not reused:
+                return None
+            cached = json.loads(json.dumps(self.entries[best_key]["response"]))  # 후처리가 결과를 변경하므로 사본 반환
+        print(f"♻️ 캐시 재사용 ({best_similarity:.2f}): '{query[:40]}' ≈ '{record['matched_query'][:40]}'")
+        cached["cache"] = {"matched_query": record["matched_query"], "similarity": record["similarity"]}
+        return cached
+
+    def store(self, query: str, profile: str, response: Dict[str, Any]) -> None:
+        if not response.get("results"):
+            return
+        normalized = normalize_query(query)
+        entry = {
+            "query": query,
+            "normalized": normalized,
+            "profile": profile,
+            "stored_at": time.time(),
+            "response": json.loads(json.dumps(response)),  # 호출자가 결과를 후처리하기 전 상태로 보관
+        }
+        with self._lock:
+            self._index(f"{profile}|{normalized}", entry)
+            if len(self.entries) > SEARCH_CACHE_MAX_ENTRIES:
+                oldest = min(self.entries, key=lambda other: self.entries[other]["stored_at"])
+                stale = self.entries.pop(oldest)
+                self.index.get((stale["profile"], query_signature(stale["normalized"])), set()).discard(oldest)
+            self.dirty = True
+
+    def flush(self) -> None:
+        """변경된 캐시(raw_content 제외)와 감사 로그를 실행 단위로 한 번에 저장"""
+        with self._lock:
+            records, self.audit_buffer = self.audit_buffer, []
+            payload = None
+            if self.dirty:
+                persisted = {}
+                for key, entry in self.entries.items():
+                    response = dict(entry["response"])
+                    response["results"] = [
+                        {name: value for name, value in result.items() if name != "raw_content"}
+                        for result in response.get("results") or [] if isinstance(result, dict)
+                    ]
+                    persisted[key] = dict(entry, response=response)
+                payload = json.dumps(persisted, ensure_ascii=False)
+                self.dirty = False
+        if records:
+            try:
+                with open(self.audit_path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            except OSError:
+                pass
+        if payload is not None:
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.path)
+            except OSError as exc:
+                print(f"⚠️ 검색 캐시 저장 실패: {exc}")
+
+
+SEARCH_CACHE = FuzzyQueryCache() if SEARCH_CACHE_ENABLED else None
+
+
+def result_list(raw_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    results_list = raw_results.get("results") or []
+    if isinstance(results_list, dict):
+        results_list = [results_list]
+    return [result for result in results_list if isinstance(result, dict)]
+
+
+def search_quality_issues(raw_results: Dict[str, Any]) -> List[str]:
+    """quality_check_node와 같은 기준(결과, 답변, 점수)으로 단일 검색 결과 진단"""
+    results_list = result_list(raw_results)
+
+    issues: List[str] = []
+    if not results_list:
+        issues.append("coverage")
+    if not raw_results.get("answer"):
+        issues.append("answers")
+    if results_list:
+        avg_score = sum(float(result.get("score") or 0.0) for result in results_list) / len(results_list)
+        if avg_score < QUALITY_CRITERIA["min_avg_score"]:
+            issues.append("score")
+    return issues
+
+
+def merge_tiered_results(basic: Dict[str, Any], advanced: Dict[str, Any]) -> Dict[str, Any]:
+    """basic/advanced 응답 중 품질이 나은 쪽을 기준으로, 다른 쪽의 새 결과와 누락된 답변을 보충"""
+    def rank(raw_results: Dict[str, Any]) -> tuple:
+        return len(search_quality_issues(raw_results)), -len(result_list(raw_results))
+
+    primary, secondary = (advanced, basic) if rank(advanced) <= rank(basic) else (basic, advanced)
+    merged = dict(primary)
+    results = list(result_list(primary))
+    seen = {result.get("url") for result in results}
+    results.extend(result for result in result_list(secondary) if result.get("url") not in seen)
+    merged["results"] = results
+    merged["answer"] = primary.get("answer") or secondary.get("answer") or ""
+    merged["error"] = "" if results else (primary.get("error") or secondary.get("error") or "")
+    merged["attempts"] = basic.get("attempts", 0) + advanced.get("attempts", 0)
+    return merged
+
+
+class TieredTavilySearch:
+    """basic 검색을 먼저 실행하고 품질 검사 실패 시에만 advanced로 승격"""
+
+    def __init__(
+        self,
+        category: str,
+        max_results: int = 5,
+        mode: Optional[str] = None,
+        budget: Optional[int] = None,
+        latency_target: Optional[float] = None,
+    ):
+        self.category = category
+        self.mode = mode or SEARCH_DEPTH_MODE
+        # 캐시는 같은 검색 설정(깊이 모드, 결과 수, 원문 포함 여부)의 결과만 재사용
+        self.cache_profile = f"{self.mode}:{max_results}:{'raw' if INCLUDE_RAW_CONTENT else 'text'}"
+        self.budget = budget  # SEARCH_BUDGET_UNIT 단위, None이면 제한 없음
+        self.latency_target = latency_target or LATENCY_TARGET_SEC
+        self.started = time.perf_counter()
+        self.spent = 0
+        self.basic_search = get_tavily_search(max_results=max_results, search_depth="basic")
+        self.advanced_search = get_tavily_search(max_results=max_results, search_depth="advanced")
+        self.queries = 0
+        self.escalations = 0
+        self.cache_hits = 0
+        self.round_trips = 0
+        self.credits = 0
+        self.latency = {"basic": 0.0, "advanced": 0.0}
+        self.calls = {"basic": 0, "advanced": 0}
+        self._lock = threading.Lock()  # 리서치 엔진이 같은 카테고리 검색을 동시에 실행할 수 있음
+
+    def affordable_attempts(self, depth: str) -> Optional[int]:
+        """남은 예산으로 가능한 호출 수 (None이면 제한 없음)"""
+        if self.budget is None:
+            return None
+        return max(0, (self.budget - self.spent) // search_cost(depth))
+
+    @property
+    def exhausted(self) -> bool:
+        """예산 또는 목표 시간을 모두 소진해 더 이상 검색하지 않아야 하는지"""
+        cheapest = "basic" if self.mode == "tiered" else "advanced"
+        if self.affordable_attempts(cheapest) == 0:
+            return True
+        return bool(self.latency_target) and time.perf_counter() - self.started >= self.latency_target
+
+    def _run(self, depth: str, query: str, max_attempts: Optional[int] = None) -> tuple:
+        """(응답, 사용한 예산) 반환. 예산은 재시도 전체가 아니라 시도 직전에 한 번씩 예약한다
+        (같은 카테고리의 동시 검색이 쓰지도 않을 재시도분 때문에 막히지 않도록)"""
+        cost = search_cost(depth)
+
+        def reserve() -> bool:
+            with self._lock:
+                if self.budget is not None and self.budget - self.spent < cost:
+                    return False
+                self.spent += cost
+                return True
+
+        tool = self.basic_search if depth == "basic" else self.advanced_search
+        started = time.perf_counter()
+        raw_results = execute_tavily_query(tool, query, max_attempts=max_attempts, category=self.category, reserve=reserve)
+        elapsed = time.perf_counter() - started
+        attempts = raw_results.get("attempts", 1)
+        if not attempts:
+            return raw_results, 0
+        with self._lock:
+            self.latency[depth] += elapsed
+            self.calls[depth] += attempts
+            self.round_trips += attempts
+            self.credits += SEARCH_DEPTH_CREDITS[depth] * attempts
+        return raw_results, cost * attempts
+
+    def search(self, query: str) -> Dict[str, Any]:
+        if SEARCH_CACHE is not None:
+            cached = SEARCH_CACHE.lookup(query, self.cache_profile, self.category)
+            if cached is not None:
+                with self._lock:
+                    self.cache_hits += 1
+                return cached
+        if self.exhausted:
+            return {"results": [], "answer": "", "error": "search budget exhausted", "attempts": 0}
+        with self._lock:
+            self.queries += 1
+        started = time.perf_counter()
+        raw_results, spent = self._search(query)
+        SEARCH_STATS.record("costs", self.category, self.mode, {
+            "spent": spent,
+            "latency": time.perf_counter() - started,
+        })
+        if SEARCH_CACHE is not None:
+            SEARCH_CACHE.store(query, self.cache_profile, raw_results)
+        return raw_results
+
+    def _search(self, query: str) -> tuple:
+        if self.mode != "tiered":
+            return self._run("advanced", query)
+
+        raw_results, spent = self._run("basic", query, max_attempts=1)
+        issues = search_quality_issues(raw_results)
+        if not issues or self.affordable_attempts("advanced") == 0:
+            return raw_results, spent
+
+        print(f"⤴️ {self.category}: basic 검색 품질 미달({', '.join(issues)}) → advanced 승격")
+        with self._lock:
+            self.escalations += 1
+        advanced_results, advanced_spent = self._run("advanced", query)
+        # advanced가 비었거나 더 나쁠 수 있으므로 두 응답을 비교해 나은 쪽을 쓰고 basic 결과도 보존
+        return merge_tiered_results(raw_results, advanced_results), spent + advanced_spent
+
+    def stats(self) -> Dict[str, Any]:
+        """승격률, 크레딧, 지연시간 절감치 (advanced 실측이 없으면 추정치로 표시)"""
+        advanced_calls = self.calls["advanced"]
+        avg_advanced = (
+            self.latency["advanced"] / advanced_calls if advanced_calls else ADVANCED_LATENCY_ESTIMATE_SEC
+        )
+        baseline_latency = avg_advanced * self.queries
+        actual_latency = self.latency["basic"] + self.latency["advanced"]
+        return {
+            "mode": self.mode,
+            "queries": self.queries,
+            "escalations": self.escalations,
+            "cache_hits": self.cache_hits,
+            "escalation_rate": round(self.escalations / self.queries, 3) if self.queries else 0.0,
+            "round_trips_per_query": round(self.round_trips / self.queries, 2) if self.queries else 0.0,
+            "credits_used": self.credits,
+            "budget_spent": self.spent,
+            "credits_saved": SEARCH_DEPTH_CREDITS["advanced"] * self.queries - self.credits,
+            "latency_sec": round(actual_latency, 2),
+            "latency_saved_sec": round(baseline_latency - actual_latency, 2),
+            # advanced 호출이 없으면 기준 지연시간이 ADVANCED_LATENCY_ESTIMATE_SEC 상수에서 나온 추정치
+            "latency_saved_estimated": not advanced_calls,
+        }
+
+    def summary(self) -> str:
+        cache_note = f", 캐시 재사용 {self.cache_hits}건" if self.cache_hits else ""
+        if self.mode != "tiered":
+            return f"Tavily Advanced{cache_note}"
+        current = self.stats()
+        return (
+            f"Tavily Tiered, advanced 승격 {current['escalations']}/{current['queries']}, "
+            f"약 {current['latency_saved_sec']:.1f}초 절감"
+            f"{' (추정: advanced 실측 없음)' if current['latency_saved_estimated'] else ' (실측 기준)'}{cache_note}"
+        )
+
+
+def record_search_depth_stats(state: AgentState, tavily_search: TieredTavilySearch) -> None:
+    """카테고리별 검색 깊이 승격 통계를 search_context에 기록"""
+    state.setdefault("search_context", {})
+    state["search_context"][f"{tavily_search.category}_depth_stats"] = tavily_search.stats()
+    spent_key = f"{tavily_search.category}_budget_spent"
+    state["search_context"][spent_key] = state["search_context"].get(spent_key, 0) + tavily_search.spent
+
+
+def category_search_budget(state: AgentState, category: str) -> Optional[int]:
+    """planning_node가 배정한 카테고리 검색 예산 (미배정 시 None)"""
+    return state.get("search_context", {}).get("search_budget", {}).get(category)
 
 def strengthen_keyword(category: str, keyword: str, state: AgentState) -> str:
     """Adjust Tavily query with quality feedback to target weak metrics."""
@@ -764,21 +1457,1819 @@ def strengthen_keyword(category: str, keyword: str, state: AgentState) -> str:
     if not issues:
         return keyword
 
-    modifiers: List[str] = []
-    if "items" in issues or "coverage" in issues:
-        modifiers.append("comprehensive data reliable sources 2024")
-    if "answers" in issues:
-        modifiers.append("key insights summary")
-    if "content" in issues:
-        modifiers.append("detailed report in depth analysis")
-    if "score" in issues:
-        modifiers.append("official statistics verified figures")
+    candidates = {
+        name: prior
+        for name, (targets, _, prior) in QUERY_MODIFIERS.items()
+        if any(issue in targets for issue in issues)
+    }
+    if VARIANT_POLICY_ENABLED and candidates:
+        selected = SEARCH_STATS.rank("modifiers", category, candidates)[:MAX_QUERY_MODIFIERS]
+    else:
+        selected = list(candidates)
+    modifiers: List[str] = [QUERY_MODIFIERS[name][1] for name in selected]
 
     if modifiers:
         boost = " ".join(modifiers)
         if boost not in keyword:
             return f"{keyword} {boost}"
     return keyword
+
+# ==================== 검색 품질 조기 종료 ====================
+EARLY_STOP_ENABLED = True  # 카테고리 품질 기준 충족 시 남은 키워드 검색 생략
+
+
+class CategoryQualityTracker:
+    """키워드 검색 결과가 들어올 때마다 QUALITY_CRITERIA 충족 여부를 갱신"""
+
+    def __init__(self, category: str, planned: int, criteria: Optional[Dict[str, Any]] = None):
+        self.category = category
+        self.planned = planned
+        self.criteria = criteria or QUALITY_CRITERIA
+        self.items = 0
+        self.hits = 0
+        self.answers = 0
+        self.result_count = 0
+        self.rich_results = 0
+        self.score_total = 0.0
+        self.quality_skipped = 0  # 품질 기준 충족 이후 건너뛴 키워드 (예산/시간 초과로 건너뛴 것은 제외)
+
+    def update(self, entry: Dict[str, Any]) -> None:
+        """키워드 1건의 처리 결과를 누적"""
+        results = entry.get("results") or []
+        self.items += 1
+        if results:
+            self.hits += 1
+        if len(entry.get("answer") or "") >= self.criteria["min_answer_chars"]:
+            self.answers += 1
+        for result in results:
+            self.result_count += 1
+            self.score_total += float(result.get("score") or 0.0)
+            if len(result.get("content") or "") >= self.criteria["min_content_chars"]:
+                self.rich_results += 1
+
+    def metrics(self) -> Dict[str, float]:
+        items = self.items or 1
+        results = self.result_count or 1
+        return {
+            "items": self.items,
+            "hit_ratio": self.hits / items,
+            "avg_score": self.score_total / results,
+            "answer_ratio": self.answers / items,
+            "content_ratio": self.rich_results / results,
+        }
+
+    def is_satisfied(self) -> bool:
+        """모든 품질 기준을 충족했는지 여부"""
+        if self.items < self.criteria["min_items"]:
+            return False
+        current = self.metrics()
+        return (
+            current["hit_ratio"] >= self.criteria["min_hit_ratio"]
+            and current["avg_score"] >= self.criteria["min_avg_score"]
+            and current["answer_ratio"] >= self.criteria["min_answer_ratio"]
+            and current["content_ratio"] >= self.criteria["min_content_ratio"]
+        )
+
+    def should_stop(self) -> bool:
+        return EARLY_STOP_ENABLED and self.is_satisfied()
+
+    def skip(self) -> None:
+        """키워드를 검색하지 않고 건너뛸 때 호출 (품질 조기 종료 때문인 경우만 절약으로 집계)"""
+        if self.should_stop():
+            self.quality_skipped += 1
+
+    @property
+    def saved_searches(self) -> int:
+        return self.quality_skipped
+
+    def summary(self) -> str:
+        if not self.saved_searches:
+            return ""
+        return f", 품질 기준 충족으로 {self.saved_searches}회 검색 절약"
+
+
+def record_search_savings(state: AgentState, tracker: CategoryQualityTracker) -> None:
+    """카테고리별 절약된 검색 횟수를 search_context에 기록"""
+    state.setdefault("search_context", {})
+    state["search_context"][f"{tracker.category}_saved_searches"] = tracker.saved_searches
+    if tracker.saved_searches:
+        print(f"⏹️ {tracker.category}: 품질 기준 충족 ({tracker.items}/{tracker.planned}) - {tracker.saved_searches}회 검색 생략")
+
+
+# ==================== 예산 기반 리서치 계획 ====================
+def expected_keyword_cost(category: str) -> tuple:
+    """카테고리 키워드 1개의 (예산 비용, 지연시간) 기대값"""
+    default_cost = search_cost("basic") + 0.3 * search_cost("advanced") if SEARCH_DEPTH_MODE == "tiered" else search_cost("advanced")
+    cost = SEARCH_STATS.mean("costs", category, SEARCH_DEPTH_MODE, "spent", default_cost)
+    latency = SEARCH_STATS.mean("costs", category, SEARCH_DEPTH_MODE, "latency", ADVANCED_LATENCY_ESTIMATE_SEC)
+    return max(cost, 1.0), max(latency, 0.1)
+
+
+def category_coverage(category: str) -> float:
+    """카테고리 키워드 이력의 평균 수율 (0~1, 이력 없으면 0.5)"""
+    patterns = SEARCH_STATS.data.get("keywords", {}).get(category, {})
+    trials = sum(arm.get("trials", 0) for arm in patterns.values())
+    if not trials:
+        return 0.5
+    return sum(arm.get("reward", 0.0) for arm in patterns.values()) / trials
+
+
+def allocate_search_budget(
+    research_plan: Dict[str, List[str]],
+    budget: int,
+    latency_target: float = 0.0,
+) -> Dict[str, int]:
+    """중요도와 과거 커버리지에 따라 카테고리별 키워드 수를 배정 (예상 비용 합계 <= budget)"""
+    costs = {category: expected_keyword_cost(category) for category in research_plan}
+    # 과거 커버리지가 낮은 카테고리일수록 더 많은 키워드가 필요
+    need = {
+        category: CATEGORY_IMPORTANCE.get(category, 1.0) * (1.5 - category_coverage(category))
+        for category in research_plan
+    }
+    limits = {}
+    for category, keywords in research_plan.items():
+        limit = len(keywords)
+        if latency_target:
+            # 카테고리는 병렬 실행되므로 카테고리별 순차 검색 시간만 목표 안에 들어오면 된다
+            limit = min(limit, int(latency_target // costs[category][1]))
+        limits[category] = limit
+
+    allocation = {category: 0 for category in research_plan}
+    remaining = float(budget) if budget else float("inf")
+    while True:
+        candidates = [
+            category for category in research_plan
+            if allocation[category] < limits[category] and costs[category][0] <= remaining
+        ]
+        if not candidates:
+            break
+        chosen = max(candidates, key=lambda category: need[category] / (allocation[category] + 1))
+        allocation[chosen] += 1
+        remaining -= costs[chosen][0]
+    return allocation
+
+
+def apply_search_budget(state: AgentState) -> None:
+    """SEARCH_BUDGET / LATENCY_TARGET_SEC에 맞춰 research_plan을 잘라내고 카테고리 예산 배정"""
+    if not SEARCH_BUDGET and not LATENCY_TARGET_SEC:
+        return
+    context = state.setdefault("search_context", {})
+    plan = state["research_plan"]
+    spent = sum(context.get(f"{category}_budget_spent", 0) for category in plan)
+    remaining = max(0, SEARCH_BUDGET - spent) if SEARCH_BUDGET else 0
+
+    if SEARCH_BUDGET and remaining == 0:
+        allocation = {category: 0 for category in plan}
+    else:
+        allocation = allocate_search_budget(plan, remaining, LATENCY_TARGET_SEC)
+    state["research_plan"] = {
+        category: prioritize_keywords(category, keywords)[:allocation[category]]
+        for category, keywords in plan.items()
+    }
+    if SEARCH_BUDGET:
+        # 기대 비용으로 나눈 몫을 카테고리 상한으로 두고, 남는 예산은 비례 배분하지 않는다
+        shares = {category: int(count * expected_keyword_cost(category)[0]) for category, count in allocation.items()}
+        while sum(shares.values()) > remaining:
+            largest = max(shares, key=shares.get)
+            shares[largest] -= 1
+        context["search_budget"] = shares
+
+    summary = ", ".join(f"{category}={count}" for category, count in allocation.items())
+    print(f"💰 검색 예산 배정 ({SEARCH_BUDGET_UNIT} 잔여 {remaining if SEARCH_BUDGET else '∞'}): {summary}")
+    state["messages"].append(f"💰 예산 기반 키워드 배정: {summary}")
+
+
+# ==================== 원문 구간 추출 ====================
+PASSAGE_TOP_K = 3  # 결과당 보관할 최대 구간 수
+PASSAGE_BYTE_BUDGET = 900  # 결과당 보관할 구간 총 바이트 (UTF-8)
+PASSAGE_WINDOW_SENTENCES = 2  # 구간 하나를 이루는 연속 문장 수
+PASSAGE_MAX_SCAN_CHARS = 200_000  # 원문에서 검사할 최대 글자 수
+PASSAGE_STOPWORDS = {"the", "and", "for", "with", "from", "that", "this", "are", "was", "its", "into", "analysis"}
+NUMBER_PATTERN = re.compile(r"\$?\d[\d,]*(?:\.\d+)?\s*(?:%|billion|million|trillion|bn|억|조|만)?", re.IGNORECASE)
+SENTENCE_PATTERN = re.compile(r"(?:[^.!?。\n]|[.!?。](?=\S))+[.!?。]*")  # 소수점/URL의 마침표는 문장 경계가 아님
+
+
+def iter_sentences(text: str, max_chars: int = PASSAGE_MAX_SCAN_CHARS):
+    """원문을 앞에서부터 문장 단위로 순차 생성 (전체 분할 리스트를 만들지 않음)"""
+    for match in SENTENCE_PATTERN.finditer(text, 0, min(len(text), max_chars)):
+        sentence = " ".join(match.group(0).split())
+        if len(sentence) >= 20:
+            yield sentence
+
+
+def query_terms(query: str) -> set:
+    return {
+        token for token in re.findall(r"[a-z0-9가-힣]+", query.lower())
+        if len(token) > 2 and token not in PASSAGE_STOPWORDS
+    }
+
+
+def score_passage(passage: str, terms: set) -> float:
+    """질의어 밀도와 수치 밀도로 구간 점수 계산"""
+    tokens = re.findall(r"[a-z0-9가-힣]+", passage.lower())
+    if not tokens:
+        return 0.0
+    term_density = sum(1 for token in tokens if token in terms) / len(tokens)
+    numeric_density = len(NUMBER_PATTERN.findall(passage)) / len(tokens)
+    return 0.7 * term_density + 0.3 * min(numeric_density * 4, 1.0)
+
+
+def extract_relevant_passages(
+    text: str,
+    query: str,
+    top_k: int = PASSAGE_TOP_K,
+    byte_budget: int = PASSAGE_BYTE_BUDGET,
+) -> List[str]:
+    """문장 슬라이딩 윈도를 점수화해 상위 구간만 바이트 예산 안에서 반환 (원문 순서 유지)"""
+    terms = query_terms(query)
+    window: deque = deque(maxlen=PASSAGE_WINDOW_SENTENCES)
+    candidates: List[tuple] = []  # (score, 시작 문장 번호, 구간) 최소 힙, 크기 제한
+    capacity = top_k * PASSAGE_WINDOW_SENTENCES
+    for index, sentence in enumerate(iter_sentences(text)):
+        window.append(sentence)
+        passage = " ".join(window)
+        item = (score_passage(passage, terms), index - len(window) + 1, passage)
+        if len(candidates) < capacity:
+            heapq.heappush(candidates, item)
+        elif item[0] > candidates[0][0]:
+            heapq.heapreplace(candidates, item)
+
+    selected: List[tuple] = []
+    used_bytes = 0
+    for score, start, passage in sorted(candidates, reverse=True):
+        if score <= 0 or len(selected) >= top_k:
+            break
+        if any(abs(start - other) < PASSAGE_WINDOW_SENTENCES for _, other, _ in selected):
+            continue  # 겹치는 윈도는 하나만
+        size = len(passage.encode("utf-8"))
+        if used_bytes + size > byte_budget:
+            remaining = byte_budget - used_bytes
+            if remaining < 80:
+                continue
+            passage = passage.encode("utf-8")[:remaining].decode("utf-8", errors="ignore")
+            size = len(passage.encode("utf-8"))
+        selected.append((score, start, passage))
+        used_bytes += size
+    return [passage for _, _, passage in sorted(selected, key=lambda item: item[1])]
+
+
+def extract_passages(category: str, entry: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """결과 후처리: raw_content가 있으면 질의 관련 구간으로 교체하고 원문은 버림"""
+    query = entry.get("query") or entry.get("keyword", "")
+    for result in entry["results"]:
+        raw_content = result.pop("raw_content", None)
+        if not raw_content:
+            continue
+        passages = extract_relevant_passages(raw_content, query)
+        if passages:
+            result["passages"] = passages
+            result["content"] = " … ".join(passages)
+    return entry
+
+
+# ==================== 근접 중복 제거 (MinHash/LSH) ====================
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 밴드당 4행: 추정 Jaccard 약 0.5 이상부터 후보로 잡힘
+NEAR_DUPLICATE_THRESHOLD = 0.7  # 후보 중 추정 Jaccard가 이 이상이면 같은 기사로 간주
+SHINGLE_WORDS = 3
+_MINHASH_PRIME = (1 << 61) - 1
+
+
+class MinHashLSH:
+    """검색 결과 제목+본문의 단어 shingle MinHash 서명을 밴드 단위로 색인"""
+
+    def __init__(self, num_perm: int = MINHASH_PERMUTATIONS, bands: int = LSH_BANDS, seed: int = 7):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.coefficients = [(rng.randrange(1, _MINHASH_PRIME), rng.randrange(0, _MINHASH_PRIME)) for _ in range(num_perm)]
+        self.buckets: Dict[tuple, List[int]] = {}
+        self.signatures: Dict[int, tuple] = {}
+        self.records: Dict[int, Dict[str, Any]] = {}
+
+    def signature(self, text: str) -> Optional[tuple]:
+        words = re.findall(r"[a-z0-9가-힣]+", text.lower())
+        if len(words) < SHINGLE_WORDS:
+            return None
+        shingles = {
+            zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"))
+            for i in range(len(words) - SHINGLE_WORDS + 1)
+        }
+        return tuple(min((a * value + b) % _MINHASH_PRIME for value in shingles) for a, b in self.coefficients)
+
+    def _bands(self, signature: tuple):
+        for band in range(self.bands):
+            yield (band, signature[band * self.rows:(band + 1) * self.rows])
+
+    def find_duplicate(self, signature: tuple) -> Optional[Dict[str, Any]]:
+        """가장 유사한 기존 레코드 (임계값 이상일 때만)"""
+        candidates = {key for band in self._bands(signature) for key in self.buckets.get(band, [])}
+        best, best_similarity = None, NEAR_DUPLICATE_THRESHOLD
+        for key in candidates:
+            other = self.signatures[key]
+            similarity = sum(1 for x, y in zip(signature, other) if x == y) / self.num_perm
+            if similarity >= best_similarity:
+                best, best_similarity = key, similarity
+        return self.records.get(best) if best is not None else None
+
+    def add(self, signature: tuple, record: Dict[str, Any]) -> None:
+        key = len(self.signatures)
+        self.signatures[key] = signature
+        self.records[key] = record
+        for band in self._bands(signature):
+            self.buckets.setdefault(band, []).append(key)
+
+
+def dedupe_results(category: str, entries: List[Dict], context: Dict[str, Any]) -> List[Dict]:
+    """카테고리 결과를 실행 전체의 LSH 색인과 대조해 근접 중복을 대표 레코드 하나로 합침.
+    같은 카테고리 안의 중복은 제거하고, 다른 카테고리가 먼저 찾은 기사는 이 카테고리 종합에도 쓰이도록 유지하되
+    duplicate_of로 대표 레코드를 참조해 출처 목록과 근거 색인에서만 한 번으로 센다 (검색 완료 순서와 무관)"""
+    index: MinHashLSH = context.setdefault("lsh", MinHashLSH())
+    removed, shared = 0, 0
+    for entry in entries:
+        unique = []
+        for result in entry.get("results", []):
+            signature = index.signature(f"{result.get('title', '')} {result.get('content', '')}")
+            if signature is None:
+                unique.append(result)
+                continue
+            canonical = index.find_duplicate(signature)
+            if canonical is None:
+                result["categories"] = [category]
+                index.add(signature, result)
+                unique.append(result)
+                continue
+            canonical.setdefault("duplicate_urls", [])
+            if result.get("url") and result["url"] != canonical.get("url") and result["url"] not in canonical["duplicate_urls"]:
+                canonical["duplicate_urls"].append(result["url"])
+            if category in canonical["categories"]:
+                removed += 1
+                continue
+            canonical["categories"].append(category)
+            result["duplicate_of"] = canonical.get("url", "")
+            unique.append(result)
+            shared += 1
+        entry["results"] = unique
+    with context.setdefault("lock", threading.Lock()):
+        context["duplicates_removed"] = context.get("duplicates_removed", 0) + removed
+        context["duplicates_shared"] = context.get("duplicates_shared", 0) + shared
+    if removed or shared:
+        print(f"🧬 {category}: 근접 중복 결과 {removed}건 제거, 다른 카테고리와 공유 {shared}건")
+    return entries
+
+
+# ==================== 근거 검색 색인 (BM25) ====================
+EVIDENCE_TOP_K = 6  # 섹션별로 프롬프트에 넣을 근거 구간 수
+EVIDENCE_MAX_CHARS = 1500  # 섹션별 근거 총 글자 수
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# 한국어 가이드라인만으로는 영문 검색 결과와 어휘가 겹치지 않으므로 섹션별 영문 질의어를 덧붙인다
+SECTION_EVIDENCE_HINTS = {
+    "executive_summary": "market size CAGR growth forecast key trends investment",
+    "market_overview": "market size billion revenue CAGR forecast region North America Asia Pacific share growth drivers",
+    "technology_trends": "model foundation VLA vision language action simulation edge AI chip accuracy latency breakthrough",
+    "industry_applications": "manufacturing logistics warehouse healthcare deployment pilot productivity use case",
+    "key_players": "company startup funding raised partnership acquisition valuation product launch",
+    "challenges": "challenge barrier cost safety regulation battery workforce risk adoption",
+    "forecast": "forecast 2026 2027 2028 2030 adoption penetration roadmap scenario",
+    "recommendations": "investment ROI partnership talent strategy adoption roadmap cost",
+    "conclusion": "outlook strategic future growth adoption",
+}
+
+
+def tokenize_text(text: str) -> List[str]:
+    return [token for token in re.findall(r"[a-z0-9가-힣]+", text.lower()) if len(token) > 1]
+
+
+class EvidenceIndex:
+    """실행 중 수집한 결과 본문과 Tavily 답변에 대한 메모리 내 BM25 역색인"""
+
+    def __init__(self):
+        self.docs: List[Dict[str, Any]] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+
+    def add(self, text: str, **meta: Any) -> None:
+        tokens = tokenize_text(text)
+        if not tokens:
+            return
+        doc_id = len(self.docs)
+        self.docs.append({"text": text, **meta})
+        self.lengths.append(len(tokens))
+        for token in tokens:
+            postings = self.postings.setdefault(token, {})
+            postings[doc_id] = postings.get(doc_id, 0) + 1
+
+    def search(self, query: str, top_k: int = EVIDENCE_TOP_K) -> List[Dict[str, Any]]:
+        if not self.docs:
+            return []
+        avg_length = sum(self.lengths) / len(self.lengths)
+        scores: Dict[int, float] = {}
+        for token in set(tokenize_text(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (len(self.docs) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [dict(self.docs[doc_id], bm25=round(score, 3)) for doc_id, score in ranked]
+
+
+def build_evidence_index(state: AgentState) -> EvidenceIndex:
+    """모든 카테고리의 결과 본문과 Tavily 답변(2문장 단위)을 색인"""
+    index = EvidenceIndex()
+    for category in RESEARCH_CATEGORIES:
+        for entry in get_category_data(state, category):
+            sentences = list(iter_sentences(entry.get("answer") or ""))
+            for start in range(0, len(sentences), 2):
+                index.add(" ".join(sentences[start:start + 2]), category=category, source=f"Tavily 답변: {entry.get('keyword', '')}", url="")
+            for result in entry.get("results", []):
+                if result.get("duplicate_of"):
+                    continue  # 대표 레코드가 다른 카테고리에서 이미 색인됨
+                index.add(
+                    f"{result.get('title', '')}. {result.get('content', '')}",
+                    category=category,
+                    source=result.get("title", ""),
+                    url=result.get("url", ""),
+                )
+    return index
+
+
+def format_evidence(hits: List[Dict[str, Any]], max_chars: int = EVIDENCE_MAX_CHARS) -> str:
+    lines: List[str] = []
+    used = 0
+    for hit in hits:
+        line = f"- [{hit['category']}] {hit['text'][:400]} (출처: {hit['source'][:60]}{', ' + hit['url'] if hit['url'] else ''})"
+        if used + len(line) > max_chars:
+            break
+        lines.append(line)
+        used += len(line)
+    return "\n".join(lines) if lines else "- (관련 근거 없음)"
+
+
+# ==================== 수치 팩트 테이블 ====================
+FACT_TABLE_MAX_ROWS = 20  # 프롬프트에 넣을 최대 팩트 행 수
+FACT_CONTEXT_BEFORE = 90  # 지표 단서를 찾을 값 앞쪽 글자 수
+FACT_CONTEXT_AFTER = 30
+
+# (지표, 단서 정규식, 허용 값 종류) - 값에 가장 가까운 단서를 채택하고 거리가 같으면 위쪽 우선
+FACT_METRICS = [
+    ("CAGR", re.compile(r"cagr|compound annual|연평균", re.IGNORECASE), {"percent"}),
+    ("market share", re.compile(r"market share|share of|점유율|비중", re.IGNORECASE), {"percent"}),
+    ("funding", re.compile(r"raised|raise|funding|series [a-f]\b|valuation|invest|투자|유치", re.IGNORECASE), {"money"}),
+    ("revenue", re.compile(r"revenue|sales|매출", re.IGNORECASE), {"money"}),
+    ("market size", re.compile(r"market|시장", re.IGNORECASE), {"money"}),
+    ("units", re.compile(r"units|shipments|shipped|deploy|install|fleet|robots|대수|보급", re.IGNORECASE), {"count"}),
+    ("growth", re.compile(r"grow|growth|increase|rise|improv|reduc|성장|증가|향상|감소", re.IGNORECASE), {"percent"}),
+]
+FACT_VALUE_PATTERN = re.compile(
+    r"(?P<currency>US\$|\$|USD\s?|€|₩)?"
+    r"(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+    r"\s*(?P<unit>%|(?i:percent|trillion|billion|million|thousand|bn|mn)\b|[BMK]\b|억|조|만)?"
+)
+FACT_COUNT_SUFFIX = re.compile(r"\s*(?:units|robots|vehicles|humanoids|대)", re.IGNORECASE)
+FACT_YEAR_RANGE = re.compile(r"\b(20[0-4]\d)\s*(?:-|–|to|~|through)\s*(20[0-4]\d)\b")
+FACT_YEAR = re.compile(r"(?<![\d.,$])((?:19|20)\d{2})(?![\d%]|[.,]\d)")
+FACT_UNIT_SCALES = {
+    "trillion": 1e12, "billion": 1e9, "million": 1e6, "thousand": 1e3,
+    "bn": 1e9, "mn": 1e6, "b": 1e9, "m": 1e6, "k": 1e3, "조": 1e12, "억": 1e8, "만": 1e4,
+}
+FACT_UNIT_LABELS = {"bn": "billion", "b": "billion", "mn": "million", "m": "million", "k": "thousand", "percent": "%"}
+
+
+def parse_fact_value(match, sentence: str) -> Optional[Dict[str, Any]]:
+    """정규식 매치 하나를 (종류, 정규화 값, 표시 문자열)로 해석. 연도나 단위 없는 수는 None"""
+    currency = (match.group("currency") or "").strip()
+    unit = (match.group("unit") or "").lower()
+    number = float(match.group("number").replace(",", ""))
+    counted = bool(FACT_COUNT_SUFFIX.match(sentence, match.end()))
+    if unit in ("%", "percent"):
+        kind = "percent"
+    elif currency:
+        kind = "money"
+    elif counted:
+        kind = "count"
+    elif unit:
+        kind = "money"  # "38 billion" 등 통화 기호 없는 금액 규모
+    else:
+        return None  # 연도, 순번 등 단위 없는 수는 팩트로 보지 않음
+    label = FACT_UNIT_LABELS.get(unit, unit)
+    spacer = "" if label in ("%", "") or not label.isascii() else " "
+    display = f"{currency}{match.group('number')}{spacer}{label}".strip()
+    if kind == "count" and not unit:
+        display += " units"
+    return {
+        "kind": kind,
+        "value": number * FACT_UNIT_SCALES.get(unit, 1.0),
+        "display": display,
+    }
+
+
+def iter_fact_values(sentence: str):
+    """문장의 수치를 순서대로 해석. "6억 7,500만"처럼 이어진 한국어 단위 금액은 하나로 합침"""
+    previous: Optional[Dict[str, Any]] = None
+    for match in FACT_VALUE_PATTERN.finditer(sentence):
+        parsed = parse_fact_value(match, sentence)
+        unit = match.group("unit") or ""
+        if (
+            parsed is not None and previous is not None and previous["korean_unit"]
+            and unit in ("억", "만") and FACT_UNIT_SCALES[unit] < FACT_UNIT_SCALES[previous["korean_unit"]]
+            and not sentence[previous["end"]:match.start()].strip()
+        ):
+            previous.update(
+                kind=parsed["kind"],
+                value=previous["value"] + parsed["value"],
+                display=f"{previous['display']} {parsed['display']}",
+                end=match.end(),
+                korean_unit=unit,
+            )
+            continue
+        if previous is not None:
+            yield previous
+            previous = None
+        if parsed is not None:
+            previous = dict(parsed, start=match.start(), end=match.end(), korean_unit=unit if unit in ("조", "억", "만") else "")
+    if previous is not None:
+        yield previous
+
+
+def nearest_year(sentence: str, position: int, metric: str) -> str:
+    """CAGR은 기간(연도 범위), 나머지는 값에 가장 가까운 연도"""
+    if metric == "CAGR":
+        year_range = FACT_YEAR_RANGE.search(sentence)
+        if year_range:
+            return f"{year_range.group(1)}-{year_range.group(2)}"
+    years = [(abs(match.start() - position), match.group(1)) for match in FACT_YEAR.finditer(sentence)]
+    return min(years)[1] if years else ""
+
+
+def extract_numeric_facts(text: str, source: str = "", url: str = "", category: str = "") -> List[Dict[str, Any]]:
+    """문장별로 (metric, value, unit, year, source URL) 튜플을 규칙 기반으로 추출"""
+    facts: List[Dict[str, Any]] = []
+    for sentence in iter_sentences(text):
+        for parsed in iter_fact_values(sentence):
+            window_start = max(0, parsed["start"] - FACT_CONTEXT_BEFORE)
+            window = sentence[window_start:parsed["end"] + FACT_CONTEXT_AFTER]
+            position = parsed["start"] - window_start
+            cues = [
+                (min(abs(cue.start() - position) for cue in pattern.finditer(window)), priority, name)
+                for priority, (name, pattern, kinds) in enumerate(FACT_METRICS)
+                if parsed["kind"] in kinds and pattern.search(window)
+            ]
+            if not cues:
+                continue
+            metric = min(cues)[2]
+            facts.append({
+                "metric": metric,
+                "value": parsed["display"],
+                "normalized": parsed["value"],
+                "year": nearest_year(sentence, parsed["start"], metric),
+                "source": source,
+                "url": url,
+                "category": category,
+            })
+    return facts
+
+
+def collect_numeric_facts(entries: List[Dict], category: str = "") -> List[Dict[str, Any]]:
+    """Tavily 답변과 결과 본문 전체에서 팩트를 모아 (지표, 값, 연도) 기준으로 병합. 같은 팩트의 출처 수를 support로 기록"""
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for entry in entries:
+        texts = [(entry.get("answer") or "", f"Tavily 답변: {entry.get('keyword', '')}", "")]
+        texts += [
+            (f"{result.get('title', '')}. {result.get('content', '')}", result.get("title", ""), result.get("url", ""))
+            for result in entry.get("results", [])
+        ]
+        for text, source, url in texts:
+            for fact in extract_numeric_facts(text, source, url, category):
+                key = (fact["metric"], round(fact["normalized"], 2), fact["year"])
+                if key in merged:
+                    merged[key]["support"] += 1
+                    if not merged[key]["url"] and url:
+                        merged[key]["url"] = url
+                else:
+                    merged[key] = dict(fact, support=1)
+    return list(merged.values())
+
+
+def collect_state_facts(state: AgentState) -> List[Dict[str, Any]]:
+    facts: List[Dict[str, Any]] = []
+    for category in RESEARCH_CATEGORIES:
+        facts.extend(collect_numeric_facts(get_category_data(state, category), category))
+    return facts
+
+
+def format_fact_table(facts: List[Dict[str, Any]], max_rows: int = FACT_TABLE_MAX_ROWS) -> str:
+    """출처가 많은 팩트 우선으로 압축 표 생성 (출처는 도메인만)"""
+    if not facts:
+        return "(추출된 수치 없음)"
+    metric_order = {name: position for position, (name, _, _) in enumerate(FACT_METRICS)}
+    ranked = sorted(facts, key=lambda fact: (-fact["support"], metric_order[fact["metric"]], fact["year"]))[:max_rows]
+    lines = ["| 지표 | 값 | 연도 | 출처 |", "|---|---|---|---|"]
+    for fact in sorted(ranked, key=lambda fact: (metric_order[fact["metric"]], fact["year"])):
+        source = urlparse(fact["url"]).netloc.replace("www.", "") if fact["url"] else fact["source"][:30]
+        extra = f" (+{fact['support'] - 1})" if fact["support"] > 1 else ""
+        lines.append(f"| {fact['metric']} | {fact['value']} | {fact['year'] or '-'} | {source}{extra} |")
+    return "\n".join(lines)
+
+
+# ==================== 근거 검증 ====================
+GROUNDING_CHECK_ENABLED = True
+GROUNDING_NUMBER_TOLERANCE = 0.01  # 근거 수치와의 허용 상대 오차 (반올림 표기 차이)
+GROUNDING_MIN_RATIO = 0.6  # 근거 확인 비율이 이보다 낮으면 리뷰 점수와 무관하게 개선
+GROUNDING_SKIP_REVIEW_RATIO = 0.35  # 이보다 낮으면 LLM 리뷰 없이 바로 개선
+GROUNDING_MIN_CLAIMS = 5  # 주장이 이보다 적으면 비율로 판정하지 않음
+GROUNDING_MAX_REPORTED = 15  # 피드백에 넣을 근거 없는 주장 수
+GROUNDING_EXCLUDED_SECTIONS = ("전략적 권고사항", "참고 자료 및 출처", "Appendix", "보고서 품질 검토 결과")  # 제안/부록은 검증 대상 아님
+ENTITY_PATTERN = re.compile(r"\b[A-Z][A-Za-z0-9]*(?:[-.][A-Za-z0-9]+)*(?:\s+[A-Z0-9][A-Za-z0-9]*(?:[-.][A-Za-z0-9]+)*)*")
+GROUNDING_ENTITY_STOPWORDS = {
+    "ai", "cagr", "roi", "kpi", "usd", "amr", "agv", "vla", "llm", "api", "si", "it", "oem", "b2b", "b2c",
+    "phase", "edge", "foundation", "model", "physical", "north", "america", "asia", "pacific", "europe",
+    "the", "and", "of", "in", "ceo", "cto", "r", "d", "m", "a", "q1", "q2", "q3", "q4",
+}
+
+
+class GroundingIndex:
+    """실행 중 수집한 근거의 토큰 역색인(EvidenceIndex)과 정규화 수치 정렬 목록"""
+
+    def __init__(self, evidence_index: EvidenceIndex):
+        self.tokens = evidence_index.postings
+        self.values: Dict[str, List[float]] = {"percent": [], "amount": []}
+        for doc in evidence_index.docs:
+            for sentence in iter_sentences(doc["text"]):
+                for parsed in iter_fact_values(sentence):
+                    self.values[grounding_kind(parsed["kind"])].append(parsed["value"])
+        for values in self.values.values():
+            values.sort()
+
+    def has_value(self, kind: str, value: float) -> bool:
+        return sorted_contains(self.values[grounding_kind(kind)], value)
+
+    def has_entity(self, entity: str) -> bool:
+        return all(token in self.tokens for token in tokenize_text(entity))
+
+
+def sorted_contains(values: List[float], value: float, tolerance: float = GROUNDING_NUMBER_TOLERANCE) -> bool:
+    """정렬된 수치 목록에 value와 상대 오차 tolerance 이내의 값이 있는지"""
+    margin = abs(value) * tolerance
+    position = bisect.bisect_left(values, value - margin)
+    return position < len(values) and values[position] <= value + margin
+
+
+def grounding_kind(kind: str) -> str:
+    # 통화 기호 없는 "381억"과 "$38.1 billion"처럼 금액/수량 구분은 표기마다 달라 하나로 본다
+    return "percent" if kind == "percent" else "amount"
+
+
+def report_claim_text(report: str) -> str:
+    """검증 대상 본문만 남김 (권고사항/출처/부록 섹션 제외)"""
+    kept: List[str] = []
+    for block in re.split(r"(?m)^(?=#{1,3} )", report):
+        heading = block.split("\n", 1)[0]
+        if heading.startswith("#") and any(excluded in heading for excluded in GROUNDING_EXCLUDED_SECTIONS):
+            continue
+        kept.append(block)
+    return re.sub(r"[*_`]", "", "".join(kept))
+
+
+def extract_report_claims(report: str) -> List[Dict[str, Any]]:
+    """보고서 본문의 수치(단위/통화 포함)와 영문 고유명사를 주장 단위로 추출"""
+    claims: List[Dict[str, Any]] = []
+    seen = set()
+    for sentence in iter_sentences(report_claim_text(report)):
+        for parsed in iter_fact_values(sentence):
+            key = ("number", grounding_kind(parsed["kind"]), round(parsed["value"], 2))
+            if key not in seen:
+                seen.add(key)
+                claims.append({"type": "number", "text": sentence[parsed["start"]:parsed["end"]].strip(), "kind": parsed["kind"], "value": parsed["value"], "sentence": sentence})
+        for match in ENTITY_PATTERN.finditer(sentence):
+            entity = match.group(0).strip()
+            tokens = tokenize_text(entity)
+            if not tokens or all(token in GROUNDING_ENTITY_STOPWORDS or token.isdigit() for token in tokens):
+                continue
+            key = ("entity", " ".join(tokens))
+            if key not in seen:
+                seen.add(key)
+                claims.append({"type": "entity", "text": entity, "sentence": sentence})
+    return claims
+
+
+def check_grounding(report: str, grounding_index: GroundingIndex) -> Dict[str, Any]:
+    """주장별 근거 존재 여부를 확인해 근거 확인 비율과 근거 없는 주장 목록 반환"""
+    claims = extract_report_claims(report)
+    ungrounded = [
+        claim for claim in claims
+        if not (
+            grounding_index.has_value(claim["kind"], claim["value"]) if claim["type"] == "number"
+            else grounding_index.has_entity(claim["text"])
+        )
+    ]
+    total = len(claims)
+    return {
+        "claims": total,
+        "grounded": total - len(ungrounded),
+        "ratio": (total - len(ungrounded)) / total if total else 1.0,
+        "numbers": sum(1 for claim in claims if claim["type"] == "number"),
+        "ungrounded": [
+            {"type": claim["type"], "text": claim["text"], "sentence": truncate_text(claim["sentence"], 160)}
+            for claim in ungrounded[:GROUNDING_MAX_REPORTED]
+        ],
+    }
+
+
+def grounding_needs_refinement(grounding: Dict[str, Any], threshold: float = GROUNDING_MIN_RATIO) -> bool:
+    return grounding.get("claims", 0) >= GROUNDING_MIN_CLAIMS and grounding.get("ratio", 1.0) < threshold
+
+
+def format_grounding_feedback(grounding: Dict[str, Any]) -> str:
+    lines = [
+        f"근거 확인 비율: {grounding['ratio']:.0%} ({grounding['grounded']}/{grounding['claims']}건)",
+        "수집된 검색 결과에서 확인되지 않은 주장 (근거 수치로 교체하거나 삭제하세요):",
+    ]
+    lines += [
+        f"- [{'수치' if claim['type'] == 'number' else '고유명사'}] {claim['text']} — \"{claim['sentence']}\""
+        for claim in grounding["ungrounded"]
+    ]
+    return "\n".join(lines)
+
+
+
+# ==================== Tavily 답변 추출 요약 (TextRank) ====================
+ANSWER_SUMMARY_ENABLED = True
+ANSWER_SUMMARY_TARGET_CHARS = 1200  # 카테고리별 종합 프롬프트에 넣을 Tavily 답변 요약 길이
+ANSWER_SUMMARY_REDUNDANCY = 0.5  # 이미 고른 문장과 토큰 Jaccard가 이 이상이면 중복으로 보고 제외
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 30
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 근사치: 영문 약 4자/토큰, 한글 약 1.5자/토큰"""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+def textrank_scores(token_sets: List[set]) -> List[float]:
+    """문장 간 어휘 겹침 그래프에 PageRank를 적용한 문장 중요도"""
+    count = len(token_sets)
+    weights = [[0.0] * count for _ in range(count)]
+    for i in range(count):
+        for j in range(i + 1, count):
+            overlap = len(token_sets[i] & token_sets[j])
+            if overlap and len(token_sets[i]) > 1 and len(token_sets[j]) > 1:
+                weight = overlap / (math.log(len(token_sets[i])) + math.log(len(token_sets[j])))
+                weights[i][j] = weights[j][i] = weight
+    out_weights = [sum(row) for row in weights]
+    scores = [1.0 / count] * count
+    for _ in range(TEXTRANK_ITERATIONS):
+        scores = [
+            (1 - TEXTRANK_DAMPING) / count + TEXTRANK_DAMPING * sum(
+                weights[j][i] / out_weights[j] * scores[j] for j in range(count) if weights[j][i]
+            )
+            for i in range(count)
+        ]
+    return scores
+
+
+def summarize_answers(answer_text: str, target_chars: int = ANSWER_SUMMARY_TARGET_CHARS) -> tuple:
+    """"[keyword]: answer" 줄들을 중요 문장만 남긴 추출 요약으로 압축 (원문 순서 유지). (요약, 통계) 반환"""
+    sentences: List[str] = []
+    for line in answer_text.splitlines():
+        if "] ERROR:" in line:
+            continue
+        for sentence in iter_sentences(re.sub(r"^\[[^\]]*\]:\s*", "", line)):
+            if sentence not in sentences:
+                sentences.append(sentence)
+
+    summary = "\n".join(f"- {sentence}" for sentence in sentences)
+    if len(summary) > target_chars:
+        token_sets = [set(tokenize_text(sentence)) for sentence in sentences]
+        scores = textrank_scores(token_sets)
+        selected: List[int] = []
+        used = 0
+        for index in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+            if used + len(sentences[index]) + 3 > target_chars:
+                continue
+            if any(
+                len(token_sets[index] & token_sets[other]) / max(1, len(token_sets[index] | token_sets[other])) >= ANSWER_SUMMARY_REDUNDANCY
+                for other in selected
+            ):
+                continue
+            selected.append(index)
+            used += len(sentences[index]) + 3
+        summary = "\n".join(f"- {sentences[index]}" for index in sorted(selected))
+
+    original_tokens = estimate_tokens(answer_text)
+    return summary, {
+        "original_chars": len(answer_text),
+        "summary_chars": len(summary),
+        "ratio": len(summary) / len(answer_text) if answer_text else 1.0,
+        "tokens_saved": max(0, original_tokens - estimate_tokens(summary)),
+    }
+
+
+# ==================== 검색 결과 재정렬 (Reranker) ====================
+RESULT_RERANKER = os.getenv("RESULT_RERANKER", "heuristic")  # RERANKERS에 등록된 이름 ("tavily": Tavily 순서 유지)
+RERANK_WEIGHTS = {"score": 0.35, "overlap": 0.25, "numeric": 0.15, "domain": 0.15, "recency": 0.10}
+RECENCY_DECAY_PER_YEAR = 0.25  # 올해 자료 1.0에서 해마다 감소
+RECENCY_UNKNOWN = 0.4  # 연도를 알 수 없는 결과의 최신성 점수
+DOMAIN_QUALITY_DEFAULT = 0.5
+DOMAIN_QUALITY_PRIORS = {
+    "reuters.com": 0.9, "bloomberg.com": 0.9, "ft.com": 0.85, "wsj.com": 0.85, "nikkei.com": 0.85,
+    "mckinsey.com": 0.9, "bcg.com": 0.85, "deloitte.com": 0.85, "pwc.com": 0.85, "gartner.com": 0.9, "idc.com": 0.9,
+    "ieee.org": 0.9, "arxiv.org": 0.8, "nature.com": 0.9, "ifr.org": 0.9, "goldmansachs.com": 0.85,
+    "nvidia.com": 0.8, "marketsandmarkets.com": 0.7, "grandviewresearch.com": 0.7, "precedenceresearch.com": 0.65,
+    "techcrunch.com": 0.75, "theverge.com": 0.7, "therobotreport.com": 0.75, "wikipedia.org": 0.6,
+    "medium.com": 0.35, "linkedin.com": 0.35, "reddit.com": 0.3, "youtube.com": 0.3, "quora.com": 0.25,
+}
+DOMAIN_QUALITY_SUFFIXES = {".gov": 0.85, ".edu": 0.8, ".ac.kr": 0.8, ".go.kr": 0.85}
+DOMAIN_LEARNING_ENABLED = True  # 실행 결과로 도메인 품질을 학습해 search_stats.json에 누적
+DOMAIN_QUALITY_SMOOTHING = 3.0  # 사전값을 이 횟수만큼의 관측으로 간주
+DOMAIN_SCORE_OBSERVATION_CAP = 5  # Tavily score 관측은 결과마다 쌓이므로 반영 횟수 상한
+DOMAIN_REPORT_OBSERVATION_CAP = 5  # 보고서 인용/리뷰 관측도 같은 방식으로 상한 (사전값이 밀려나지 않도록)
+DOMAIN_QUALITY_MIN = 0.3  # 학습된 품질이 이보다 낮은 도메인 결과는 데이터에 넣기 전에 제외
+DOMAIN_EXPLORATION_RATE = 0.1  # 제외 대상 결과를 이 확률로 통과시켜 다시 관측 (영구 제외 방지)
+
+
+def result_domain(url: str) -> str:
+    domain = urlparse(url).netloc.lower().split(":")[0] if url else ""
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def domain_prior(domain: str) -> float:
+    """정적 도메인 신뢰도 사전값 (0~1). 하위 도메인은 상위 도메인 값을 따른다"""
+    parts = domain.split(".")
+    for start in range(len(parts) - 1):
+        prior = DOMAIN_QUALITY_PRIORS.get(".".join(parts[start:]))
+        if prior is not None:
+            return prior
+    for suffix, quality in DOMAIN_QUALITY_SUFFIXES.items():
+        if domain.endswith(suffix):
+            return quality
+    return DOMAIN_QUALITY_DEFAULT
+
+
+def domain_quality(url: str) -> float:
+    """사전값을 Tavily score, 최종 보고서 인용률, 리뷰 점수 관측으로 보정한 도메인 품질 (0~1)"""
+    domain = result_domain(url)
+    prior = domain_prior(domain)
+    if not DOMAIN_LEARNING_ENABLED or not domain:
+        return prior
+    scores = SEARCH_STATS.get("domain_scores", "all", domain)
+    reports = SEARCH_STATS.get("domain_reports", "all", domain)
+    weighted = DOMAIN_QUALITY_SMOOTHING * prior
+    observations = DOMAIN_QUALITY_SMOOTHING
+    if scores.get("trials"):
+        count = min(scores["trials"], DOMAIN_SCORE_OBSERVATION_CAP)
+        weighted += count * scores.get("score", 0.0) / scores["trials"]
+        observations += count
+    if reports.get("trials"):
+        count = min(reports["trials"], DOMAIN_REPORT_OBSERVATION_CAP)
+        weighted += count * reports.get("cited", 0.0) / reports["trials"]  # 인용률 (인용된 실행 1, 아니면 0)
+        observations += count
+    if reports.get("reviewed"):
+        count = min(reports["reviewed"], DOMAIN_REPORT_OBSERVATION_CAP)
+        weighted += count * reports.get("review", 0.0) / reports["reviewed"]  # 인용된 실행의 평균 리뷰 점수 (0~1)
+        observations += count
+    return weighted / observations
+
+
+def filter_low_quality_domains(category: str, entry: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """결과 후처리: 도메인별 Tavily score를 기록하고, 학습된 품질이 낮은 도메인 결과는 제외 (최소 1개는 유지, 일부는 탐색용으로 통과)"""
+    results = entry["results"]
+    if DOMAIN_LEARNING_ENABLED and not entry.get("cached"):
+        SEARCH_STATS.record_many("domain_scores", "all", [
+            (result_domain(result.get("url", "")), {"score": float(result.get("score") or 0.0)})
+            for result in results if result.get("url")
+        ])
+    kept, explored = [], 0
+    for result in results:
+        if domain_quality(result.get("url", "")) >= DOMAIN_QUALITY_MIN:
+            kept.append(result)
+        elif random.random() < DOMAIN_EXPLORATION_RATE:
+            # 제외된 도메인은 보고서 피드백을 받을 수 없으므로 가끔 통과시켜 품질을 다시 학습
+            kept.append(result)
+            explored += 1
+    if not kept and results:
+        kept = [max(results, key=lambda result: domain_quality(result.get("url", "")))]
+    removed = len(results) - len(kept)
+    if removed or explored:
+        with context.setdefault("lock", threading.Lock()):
+            context["domains_filtered"] = context.get("domains_filtered", 0) + removed
+            context["domains_explored"] = context.get("domains_explored", 0) + explored
+    entry["results"] = kept
+    return entry
+
+
+def record_domain_feedback(state: AgentState) -> Dict[str, int]:
+    """최종 보고서 기준으로 도메인별 인용 여부(수치가 보고서에 쓰였는지)와 리뷰 점수를 누적 (수치가 있던 결과만)"""
+    report_values = sorted(
+        claim["value"] for claim in extract_report_claims(state.get("final_report", "")) if claim["type"] == "number"
+    )
+    domains: Dict[str, bool] = {}
+    for category in RESEARCH_CATEGORIES:
+        for entry in get_category_data(state, category):
+            for result in entry.get("results", []):
+                domain = result_domain(result.get("url", ""))
+                if not domain:
+                    continue
+                values = [
+                    parsed["value"]
+                    for sentence in iter_sentences(f"{result.get('title', '')}. {result.get('content', '')}")
+                    for parsed in iter_fact_values(sentence)
+                ]
+                if not values:
+                    continue  # 정성적 내용만 있는 결과는 수치 인용으로 판단할 수 없음
+                cited = any(sorted_contains(report_values, value) for value in values)
+                domains[domain] = domains.get(domain, False) or cited
+    review = max(0.0, min(1.0, float(state.get("quality_score") or 0.0) / 10))
+    SEARCH_STATS.record_many("domain_reports", "all", [
+        (domain, {"cited": 1.0, "review": review, "reviewed": 1.0} if cited else {"cited": 0.0})
+        for domain, cited in domains.items()
+    ])
+    return {"domains": len(domains), "cited": sum(domains.values())}
+
+
+def recency_score(result: Dict[str, Any], current_year: Optional[int] = None) -> float:
+    """published_date(있으면) 또는 제목/본문에 나온 가장 최근 과거 연도로 최신성 점수 계산"""
+    current_year = current_year or datetime.now().year
+    text = f"{result.get('published_date') or ''} {result.get('title', '')} {result.get('content', '')[:1000]}"
+    years = [int(year) for year in FACT_YEAR.findall(text) if int(year) <= current_year]
+    if not years:
+        return RECENCY_UNKNOWN
+    return max(0.0, 1.0 - RECENCY_DECAY_PER_YEAR * (current_year - max(years)))
+
+
+def rerank_features(result: Dict[str, Any], terms: set) -> Dict[str, float]:
+    content = f"{result.get('title', '')} {result.get('content', '')}"
+    tokens = re.findall(r"[a-z0-9가-힣]+", content.lower())
+    return {
+        "score": min(1.0, max(0.0, float(result.get("score") or 0.0))),
+        "overlap": len(terms & set(tokens)) / len(terms) if terms else 0.0,
+        "numeric": min(1.0, len(NUMBER_PATTERN.findall(content)) / max(1, len(tokens)) * 10),
+        "domain": domain_quality(result.get("url", "")),
+        "recency": recency_score(result),
+    }
+
+
+def heuristic_reranker(results: List[Dict[str, Any]], query: str) -> List[float]:
+    """Tavily score, 질의어 겹침, 수치 밀도, 도메인 신뢰도, 최신성의 가중합"""
+    terms = query_terms(query)
+    return [
+        sum(RERANK_WEIGHTS[name] * value for name, value in rerank_features(result, terms).items())
+        for result in results
+    ]
+
+
+def tavily_order_reranker(results: List[Dict[str, Any]], query: str) -> List[float]:
+    return [float(len(results) - position) for position in range(len(results))]
+
+
+# (results, query) -> 결과별 점수. 높은 점수가 앞으로 온다
+RERANKERS: Dict[str, Any] = {"heuristic": heuristic_reranker, "tavily": tavily_order_reranker}
+
+
+def register_reranker(name: str, reranker: Any) -> None:
+    RERANKERS[name] = reranker
+
+
+def rerank_results(category: str, entry: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """결과 후처리: 자르기 전에 결과를 재정렬해 고정 슬롯(상위 N개)에 가장 좋은 근거가 오도록 함"""
+    reranker = RERANKERS.get(RESULT_RERANKER, heuristic_reranker)
+    results = entry["results"]
+    if len(results) > 1:
+        scores = reranker(results, entry.get("query") or entry.get("keyword", ""))
+        for result, score in zip(results, scores):
+            result["rerank_score"] = round(score, 4)
+        entry["results"] = [result for _, _, result in sorted(
+            zip(scores, range(len(results)), results), key=lambda item: (-item[0], item[1])
+        )]
+    return entry
+
+
+def benchmark_reranker(rounds: int = 300, results_per_query: int = 5, seed: int = 13) -> Dict[str, float]:
+    """합성 결과로 재정렬기 마이크로 벤치마크: 결과당 처리 시간과 '좋은 결과' top-1/top-2 적중률 (Tavily 순서 대비)"""
+    rng = random.Random(seed)
+    year = datetime.now().year
+    good_template = "The Physical AI market reached $%d.%d billion in %d, with a CAGR of %d%% driven by humanoid robot deployments."
+    filler = [
+        ("https://medium.com/@user/post", "Thoughts on robots and the future of work, some opinions and general commentary."),
+        ("https://www.reddit.com/r/robotics", "Discussion thread about whether robots will be useful someday, no figures."),
+        ("https://example-blog.net/ai", "An overview of artificial intelligence history from the 1950s onward."),
+        ("https://www.youtube.com/watch", "Video: humanoid robot demo compilation, watch now."),
+    ]
+    queries = ["physical AI market size CAGR", "humanoid robot market forecast", "physical AI humanoid deployments"]
+    hits = {name: {"top1": 0, "top2": 0} for name in RERANKERS}
+    elapsed = {name: 0.0 for name in RERANKERS}
+    for _ in range(rounds):
+        query = rng.choice(queries)
+        results = [
+            {"url": url, "title": text[:30], "content": text, "score": round(rng.uniform(0.5, 0.95), 2)}
+            for url, text in rng.sample(filler, min(len(filler), results_per_query - 1))
+        ]
+        good = {
+            "url": "https://www.reuters.com/technology/physical-ai",
+            "title": "Physical AI market report",
+            "content": good_template % (rng.randint(2, 40), rng.randint(0, 9), year - rng.randint(0, 1), rng.randint(15, 40)),
+            "score": round(rng.uniform(0.3, 0.7), 2),
+        }
+        results.insert(rng.randrange(len(results) + 1), good)
+        for name, reranker in RERANKERS.items():
+            started = time.perf_counter()
+            scores = reranker(results, query)
+            elapsed[name] += time.perf_counter() - started
+            order = sorted(range(len(results)), key=lambda index: (-scores[index], index))
+            hits[name]["top1"] += results[order[0]] is good
+            hits[name]["top2"] += good in (results[order[0]], results[order[1]])
+
+    report: Dict[str, float] = {}
+    for name in RERANKERS:
+        per_result_us = elapsed[name] / (rounds * results_per_query) * 1e6
+        report[f"{name}_us_per_result"] = round(per_result_us, 2)
+        report[f"{name}_top1"] = hits[name]["top1"] / rounds
+        report[f"{name}_top2"] = hits[name]["top2"] / rounds
+        print(
+            f"⏱️ {name:>10}: 결과당 {per_result_us:7.2f}µs, "
+            f"top-1 {hits[name]['top1'] / rounds:.0%}, top-2 {hits[name]['top2'] / rounds:.0%}"
+        )
+    return report
+
+
+# ==================== 리서치 엔진 ====================
+RESEARCH_CONCURRENCY = int(os.getenv("RESEARCH_CONCURRENCY", "5"))  # 전체 카테고리가 공유하는 동시 검색 수
+RESEARCH_CATEGORY_CONCURRENCY = 2  # 카테고리별 동시 검색 상한 (조기 종료 효과 유지)
+RESEARCH_RANK_DECAY = 0.85  # 카테고리 내 순위가 뒤로 갈수록 전역 우선순위를 낮추는 비율
+CONTENT_BUDGET_MODE = "adaptive"  # "fixed": 키워드당 상위 2개 x 250자, "adaptive": 카테고리 예산을 score/신규성 비례 배분
+CATEGORY_CONTENT_BUDGET_CHARS = int(os.getenv("CATEGORY_CONTENT_BUDGET_CHARS", "2500"))  # 카테고리 전체 결과 본문 예산 (fixed 모드 최대치 5 x 2 x 250과 동일)
+RESEARCH_MAX_RESULTS = int(os.getenv("RESEARCH_MAX_RESULTS", "5"))  # 키워드당 Tavily 결과 수
+MIN_RESULT_SCORE = 0.2  # 이보다 낮은 Tavily score 결과는 버림
+MIN_RESULT_NOVELTY = 0.25  # 앞선 결과와 거의 같은 내용이면 버림
+MIN_RESULT_CHARS = 80  # 배분량이 이보다 작으면 버리고 다른 결과에 재배분
+SYNTHESIS_DETAIL_CHARS = 600  # 종합 프롬프트에 넣을 상세 결과 총 글자 수 (기존 3 x 200)
+STREAMING_SYNTHESIS = True  # 카테고리 검색이 끝나는 즉시 해당 카테고리 종합 시작
+SYNTHESIS_CONCURRENCY = 3  # 스트리밍 종합 동시 LLM 호출 수
+
+# 카테고리 레지스트리: 이름 -> {label, data_key, default_keywords, result_processors, category_processors}
+RESEARCH_CATEGORIES: Dict[str, Dict[str, Any]] = {}
+
+
+def trim_results(category: str, entry: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """기본 결과 후처리: 상위 2개 결과만 250자로 잘라 보관 (원문 추출 구간은 바이트 예산까지 유지).
+    adaptive 모드에서는 자르지 않고 allocate_content_budget이 카테고리 단위로 배분한다."""
+    adaptive = CONTENT_BUDGET_MODE == "adaptive"
+    trimmed = []
+    for result in entry["results"] if adaptive else entry["results"][:2]:
+        item = {
+            "url": result.get("url", ""),
+            "title": result.get("title", ""),
+            "content": (result.get("content") or "") if adaptive else (result.get("content") or "")[:250],
+            "score": result.get("score", 0.0),  # 관련성 점수
+        }
+        if "rerank_score" in result:
+            item["rerank_score"] = result["rerank_score"]
+        if result.get("passages"):
+            item["content"] = result["content"]
+            item["passages"] = result["passages"]
+        trimmed.append(item)
+    entry["results"] = trimmed
+    return entry
+
+
+def truncate_text(text: str, limit: int) -> str:
+    """단어 경계에서 limit 글자 이내로 자르기"""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > limit * 0.6 else cut).rstrip() + "…"
+
+
+def allocate_content_budget(category: str, entries: List[Dict], context: Dict[str, Any]) -> List[Dict]:
+    """카테고리 본문 예산을 score x 신규성 비례로 결과에 배분하고 가치 낮은 결과는 제거"""
+    if CONTENT_BUDGET_MODE != "adaptive":
+        return entries
+
+    candidates = sorted(
+        (result for entry in entries for result in entry.get("results", [])),
+        key=lambda result: -float(result.get("rerank_score", result.get("score")) or 0.0),
+    )
+    seen_tokens: List[set] = []
+    weights: Dict[int, float] = {}
+    for result in candidates:
+        tokens = set(re.findall(r"[a-z0-9가-힣]+", (result.get("content") or "").lower()))
+        overlap = max((len(tokens & other) / len(tokens | other) for other in seen_tokens if tokens | other), default=0.0)
+        novelty = 1.0 - overlap
+        score = float(result.get("score") or 0.0)
+        seen_tokens.append(tokens)
+        if score >= MIN_RESULT_SCORE and novelty >= MIN_RESULT_NOVELTY and tokens:
+            weights[id(result)] = float(result.get("rerank_score", score)) * novelty
+
+    # 배분량이 최소치에 못 미치는 결과를 빼고 남은 결과에 다시 배분
+    allocation: Dict[int, int] = {}
+    while weights:
+        total = sum(weights.values())
+        allocation = {key: int(CATEGORY_CONTENT_BUDGET_CHARS * weight / total) for key, weight in weights.items()}
+        too_small = [key for key, chars in allocation.items() if chars < MIN_RESULT_CHARS]
+        if not too_small:
+            break
+        del weights[min(too_small, key=lambda key: weights[key])]
+
+    kept, dropped = 0, 0
+    for entry in entries:
+        results = []
+        for result in entry.get("results", []):
+            chars = allocation.get(id(result)) if weights else None
+            if not chars:
+                dropped += 1
+                continue
+            result["content"] = truncate_text(result.get("content") or "", chars)
+            result["weight"] = round(weights[id(result)], 4)
+            results.append(result)
+        entry["results"] = sorted(results, key=lambda result: -result["weight"])
+        kept += len(results)
+    print(f"📐 {category}: 본문 예산 {CATEGORY_CONTENT_BUDGET_CHARS}자를 결과 {kept}개에 배분 ({dropped}개 제외)")
+    return entries
+
+
+DEFAULT_RESULT_PROCESSORS: List[Any] = [extract_passages, filter_low_quality_domains, rerank_results, trim_results]
+DEFAULT_CATEGORY_PROCESSORS: List[Any] = [dedupe_results, allocate_content_budget]
+
+
+def register_research_category(
+    name: str,
+    label: str,
+    default_keywords: Optional[List[str]] = None,
+    data_key: Optional[str] = None,
+    result_processors: Optional[List[Any]] = None,
+    category_processors: Optional[List[Any]] = None,
+) -> None:
+    """리서치 카테고리 등록. 노드 함수를 새로 만들지 않고도 research_node가 함께 실행한다.
+
+    result_processors: (category, entry, context) -> entry, 키워드 결과마다 순서대로 적용
+    category_processors: (category, entries, context) -> entries, 카테고리 검색 완료 시 적용
+    """
+    RESEARCH_CATEGORIES[name] = {
+        "label": label,
+        "data_key": data_key,
+        "default_keywords": list(default_keywords or DEFAULT_RESEARCH_PLAN.get(name, [])),
+        "result_processors": list(result_processors) if result_processors is not None else list(DEFAULT_RESULT_PROCESSORS),
+        "category_processors": list(category_processors) if category_processors is not None else list(DEFAULT_CATEGORY_PROCESSORS),
+    }
+
+
+register_research_category("market", "시장", data_key="market_data")
+register_research_category("tech", "기술", data_key="tech_data")
+register_research_category("industry", "산업", data_key="industry_data")
+register_research_category("company", "기업", data_key="company_data")
+register_research_category("challenge", "도전과제", data_key="challenge_data")
+
+
+def get_category_data(state: AgentState, category: str) -> List[Dict]:
+    """카테고리 수집 결과 조회 (기본 카테고리는 기존 <category>_data 필드 사용)"""
+    data_key = RESEARCH_CATEGORIES.get(category, {}).get("data_key")
+    if data_key and state.get(data_key):
+        return state[data_key]
+    return (state.get("research_data") or {}).get(category, [])
+
+
+class CategoryResearchRun:
+    """research_node 안에서 카테고리 하나의 진행 상태"""
+
+    def __init__(self, category: str, keywords: List[str], state: AgentState):
+        self.category = category
+        self.spec = RESEARCH_CATEGORIES[category]
+        self.keywords = keywords
+        self.search = TieredTavilySearch(category, max_results=RESEARCH_MAX_RESULTS, budget=category_search_budget(state, category))
+        self.tracker = CategoryQualityTracker(category, len(keywords))
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.queued = len(keywords)
+        self.pending = 0
+        self.finished = False
+
+    def accepts_more(self) -> bool:
+        return not (self.tracker.should_stop() or self.search.exhausted)
+
+    @property
+    def complete(self) -> bool:
+        return self.queued == 0 and self.pending == 0
+
+
+def search_keyword(run: CategoryResearchRun, keyword: str, state: AgentState, context: Dict[str, Any]) -> Dict[str, Any]:
+    """키워드 1건 검색 후 카테고리 result_processors 적용 (작업 큐 워커에서 실행)"""
+    category = run.category
+    query = keyword
+    try:
+        query = strengthen_keyword(category, keyword, state)
+        raw_results = run.search.search(query)
+        results_list = raw_results.get("results", []) or []
+        if isinstance(results_list, dict):
+            results_list = [results_list]
+        elif not isinstance(results_list, list):
+            results_list = []
+
+        entry = {
+            "keyword": keyword,
+            "query": query,
+            "results": [result for result in results_list if isinstance(result, dict)],
+            "error": raw_results.get("error", ""),
+            "answer": raw_results.get("answer", "") or "",  # Tavily AI 답변
+            "cached": bool(raw_results.get("cache")),  # 캐시 재사용 결과는 검색 통계에 기록하지 않음
+        }
+        for processor in run.spec["result_processors"]:
+            entry = processor(category, entry, context)
+        return entry
+    except Exception as e:
+        print(f"검색 오류: {keyword} - {e}")
+        return {"keyword": keyword, "query": query, "results": [], "error": str(e), "answer": ""}
+
+
+def finalize_category(run: CategoryResearchRun, state: AgentState, context: Dict[str, Any]) -> None:
+    """카테고리 검색 완료 시 category_processors 적용 후 상태에 기록"""
+    category = run.category
+    entries = [run.entries[rank] for rank in sorted(run.entries)]
+    for entry in entries:
+        # 카테고리 후처리(중복 제거, 본문 예산 배분)는 다른 키워드 결과에 좌우되므로 그 전에 근거를 식별
+        entry["evidence_fingerprint"] = keyword_evidence_fingerprint(entry)
+    for processor in run.spec["category_processors"]:
+        entries = processor(category, entries, context)
+
+    search_contexts = []
+    for entry in entries:
+        if entry.get("error") and not entry.get("results"):
+            search_contexts.append(f"[{entry['keyword']}] ERROR: {entry['error']}")
+        if entry.get("answer"):
+            search_contexts.append(f"[{entry['keyword']}]: {entry['answer']}")
+
+    state.setdefault("research_data", {})[category] = entries
+    if run.spec["data_key"]:
+        state[run.spec["data_key"]] = entries
+    state["search_context"][category] = "\n".join(search_contexts)
+    answers = state["search_context"][category]
+    if ANSWER_SUMMARY_ENABLED and SYNTHESIS_MODE != "incremental":
+        # 요약본은 카테고리 종합 프롬프트에만 들어가므로 키워드 단위 종합에서는 만들지 않음 (절감량도 보고하지 않음)
+        answers, compression = summarize_answers(answers)
+        context.setdefault("answer_compression", {})[category] = compression
+    state["search_context"][f"{category}_digest"] = answers
+    record_search_savings(state, run.tracker)
+    record_search_depth_stats(state, run.search)
+    state["messages"].append(
+        f"✅ {run.spec['label']} 데이터 {len(entries)}건 수집 ({run.search.summary()}{run.tracker.summary()})"
+    )
+    run.finished = True
+
+    synthesis_executor = context.get("synthesis_executor")
+    if synthesis_executor is not None:
+        # 남은 카테고리 검색과 겹치도록 이 카테고리 종합을 바로 시작
+        context["synthesis_futures"][category] = (
+            time.perf_counter(),
+            synthesis_executor.submit(synthesize_category, category, answers, entries),
+        )
+
+
+def join_streamed_synthesis(state: AgentState, context: Dict[str, Any], research_finished: float) -> None:
+    """research_node 끝에서 스트리밍 종합 결과를 모아 synthesized_data에 기록"""
+    futures = context.get("synthesis_futures") or {}
+    if not futures:
+        return
+    synthesized = dict(state.get("synthesized_data") or {})
+    streamed: List[str] = []
+    overlap = 0.0
+    for category, (started, future) in futures.items():
+        try:
+            synthesized[category] = future.result()
+        except Exception as exc:
+            print(f"⚠️ {category} 스트리밍 종합 실패, synthesis_node에서 재시도: {exc}")
+            continue
+        streamed.append(category)
+        overlap += max(0.0, research_finished - started)
+    state["synthesized_data"] = synthesized
+    state["search_context"]["streamed_synthesis"] = streamed
+    state["messages"].append(f"⚡ 스트리밍 종합 {len(streamed)}개 카테고리 (검색과 겹친 종합 시간 약 {overlap:.1f}초)")
+
+
+def research_node(state: AgentState) -> AgentState:
+    """등록된 모든 카테고리를 하나의 공유 작업 큐로 검색 (전역 우선순위 적용)"""
+    state.setdefault("search_context", {})
+    context: Dict[str, Any] = {"state": state, "lock": threading.Lock()}  # lock: 워커 스레드의 context 갱신용
+    plan = state.get("research_plan") or {}
+
+    runs: Dict[str, CategoryResearchRun] = {}
+    queue: List[tuple] = []
+    for category in RESEARCH_CATEGORIES:
+        keywords = prioritize_keywords(category, plan.get(category, []))
+        run = CategoryResearchRun(category, keywords, state)
+        runs[category] = run
+        importance = CATEGORY_IMPORTANCE.get(category, 1.0)
+        for rank, keyword in enumerate(keywords):
+            priority = importance * expected_keyword_yield(category, keyword) * RESEARCH_RANK_DECAY ** rank
+            heapq.heappush(queue, (-priority, rank, category, keyword))
+
+    for run in runs.values():
+        if run.complete:
+            finalize_category(run, state, context)
+
+    synthesis_executor = ThreadPoolExecutor(max_workers=SYNTHESIS_CONCURRENCY) if STREAMING_SYNTHESIS else None
+    context["synthesis_executor"] = synthesis_executor
+    context["synthesis_futures"] = {}
+
+    in_flight: Dict[Any, tuple] = {}
+    with ThreadPoolExecutor(max_workers=max(1, RESEARCH_CONCURRENCY)) as executor:
+        while queue or in_flight:
+            deferred = []
+            while queue and len(in_flight) < RESEARCH_CONCURRENCY:
+                item = heapq.heappop(queue)
+                _, rank, category, keyword = item
+                run = runs[category]
+                if run.accepts_more() and run.pending >= RESEARCH_CATEGORY_CONCURRENCY:
+                    deferred.append(item)
+                    continue
+                run.queued -= 1
+                if run.accepts_more():
+                    run.pending += 1
+                    future = executor.submit(search_keyword, run, keyword, state, context)
+                    in_flight[future] = (category, rank)
+                else:
+                    run.tracker.skip()
+                    if run.complete:
+                        finalize_category(run, state, context)
+            for item in deferred:
+                heapq.heappush(queue, item)
+
+            if not in_flight:
+                continue
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                category, rank = in_flight.pop(future)
+                run = runs[category]
+                entry = future.result()
+                run.pending -= 1
+                run.entries[rank] = entry
+                run.tracker.update(entry)
+                if not entry.get("cached"):
+                    record_keyword_yield(category, entry["keyword"], entry)
+                if run.complete:
+                    finalize_category(run, state, context)
+
+    for run in runs.values():
+        if not run.finished:
+            finalize_category(run, state, context)
+
+    if context.get("domains_filtered"):
+        state["messages"].append(f"🏷️ 저품질 도메인 결과 {context['domains_filtered']}건 제외 (학습된 도메인 품질 < {DOMAIN_QUALITY_MIN})")
+    if context.get("domains_explored"):
+        state["messages"].append(f"🎲 저품질 도메인 결과 {context['domains_explored']}건 탐색용으로 유지 (품질 재학습)")
+
+    if context.get("duplicates_removed"):
+        state["messages"].append(f"🧬 근접 중복 결과 {context['duplicates_removed']}건을 대표 레코드로 통합 (MinHash/LSH)")
+    if context.get("duplicates_shared"):
+        state["messages"].append(f"🔗 여러 카테고리에 걸친 기사 {context['duplicates_shared']}건은 각 카테고리에 유지 (출처/근거 색인에서는 1회)")
+
+    compression = context.get("answer_compression") or {}
+    if compression:
+        original = sum(stats["original_chars"] for stats in compression.values())
+        summarized = sum(stats["summary_chars"] for stats in compression.values())
+        saved = sum(stats["tokens_saved"] for stats in compression.values())
+        print(f"✂️ Tavily 답변 추출 요약: {original:,}→{summarized:,}자 ({summarized / max(1, original):.0%}), 약 {saved:,} 토큰 절감")
+        state["messages"].append(
+            f"✂️ Tavily 답변 TextRank 요약 (압축률 {summarized / max(1, original):.0%}, 종합 프롬프트 약 {saved:,} 토큰 절감)"
+        )
+
+    if synthesis_executor is not None:
+        join_streamed_synthesis(state, context, time.perf_counter())
+        synthesis_executor.shutdown(wait=False)
+    SEARCH_STATS.flush()
+    if SEARCH_CACHE is not None:
+        SEARCH_CACHE.flush()
+    return state
+
+# ==================== 계층적 종합 (Map-Reduce) ====================
+# "single" | "map_reduce" | "auto": 입력이 예산을 넘을 때만 map-reduce | "incremental": 키워드 단위 종합 메모이제이션 후 로컬 병합
+SYNTHESIS_MODE = os.getenv("SYNTHESIS_MODE", "auto")  # incremental은 Tavily 답변 요약(digest)을 쓰지 않으므로 선택 사항
+SYNTHESIS_INPUT_TOKEN_BUDGET = 3000  # 카테고리 종합(reduce) 프롬프트에 넣을 상세 데이터 토큰 상한
+MAP_CHUNK_TOKEN_BUDGET = 1500  # map 호출 하나에 넣을 최소 토큰 (청크가 너무 잘게 나뉘지 않도록)
+MAP_MAX_FANOUT = 12  # 단계별 최대 map 호출 수 (넘으면 청크 크기를 키움)
+MAP_CONCURRENCY = 4
+MAP_MAX_LEVELS = 3  # 요약의 요약 최대 단계
+
+map_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 Physical AI 리서치 보조 분석가입니다.
+주어진 검색 결과 묶음에서 핵심 사실만 불릿 5개 이내로 요약하세요.
+수치(값, 단위, 연도), 기업/제품명, 출처 도메인은 원문 그대로 보존하고 추측은 넣지 마세요."""),
+    ("user", """카테고리: {category}
+
+검색 결과:
+{chunk}""")
+])
+
+
+def category_evidence_units(detailed_data: List[Dict]) -> List[str]:
+    """키워드별 검색 결과 전체(답변 + 결과 본문)를 map 입력 단위로 구성"""
+    units = []
+    for item in detailed_data:
+        lines = [f"[{item.get('keyword', '')}]"]
+        if item.get("answer"):
+            lines.append(f"답변: {item['answer']}")
+        for result in item.get("results", []):
+            domain = result_domain(result.get("url", ""))
+            lines.append(f"- {result.get('title', '')} ({domain}): {result.get('content', '')}")
+        if len(lines) > 1:
+            units.append("\n".join(lines))
+    return units
+
+
+def pack_evidence_chunks(units: List[str], chunk_tokens: int) -> List[str]:
+    """단위들을 순서대로 토큰 예산 이하 청크로 묶음 (단독으로 넘치는 단위는 잘라냄)"""
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+    for unit in units:
+        tokens = estimate_tokens(unit)
+        if tokens > chunk_tokens:
+            unit = truncate_text(unit, int(len(unit) * chunk_tokens / tokens))
+            tokens = estimate_tokens(unit)
+        if current and used + tokens > chunk_tokens:
+            chunks.append("\n\n".join(current))
+            current, used = [], 0
+        current.append(unit)
+        used += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def summarize_chunk(category: str, chunk: str) -> str:
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    try:
+        return llm.invoke(map_prompt.format_messages(category=category, chunk=chunk)).content
+    except Exception as exc:
+        print(f"⚠️ {category} map 요약 실패, 원문 일부 사용: {exc}")
+        return truncate_text(chunk, MAP_CHUNK_TOKEN_BUDGET)
+
+
+def select_detail_snippets(detailed_data: List[Dict]) -> List[str]:
+    """상세 데이터 요약 (상위 3개 결과만, adaptive 모드는 배분 가중치 순으로 같은 글자 예산 안에서)"""
+    detailed_summary = []
+    weighted = sorted(
+        (result for item in detailed_data for result in item.get("results", []) if result.get("weight")),
+        key=lambda result: -result["weight"],
+    )
+    if weighted:
+        total_weight = sum(result["weight"] for result in weighted)
+        remaining = SYNTHESIS_DETAIL_CHARS
+        for result in weighted:
+            if remaining < MIN_RESULT_CHARS:
+                break
+            share = max(MIN_RESULT_CHARS, int(SYNTHESIS_DETAIL_CHARS * result["weight"] / total_weight))
+            content = truncate_text(result.get("content", ""), min(share, remaining))
+            detailed_summary.append(f"- {result.get('title', '')}: {content}")
+            remaining -= len(content)
+    else:
+        for item in detailed_data[:3]:
+            if item.get("results"):
+                top_result = item["results"][0]
+                detailed_summary.append(
+                    f"- {top_result.get('title', '')}: {top_result.get('content', '')[:200]}"
+                )
+    return detailed_summary
+
+
+def map_reduce_evidence(category: str, units: List[str]) -> str:
+    """청크별 요약(map)을 병렬 실행하고, 합친 요약이 reduce 예산을 넘으면 요약을 다시 요약"""
+    total = sum(estimate_tokens(unit) for unit in units)
+    for level in range(1, MAP_MAX_LEVELS + 1):
+        chunk_tokens = max(MAP_CHUNK_TOKEN_BUDGET, math.ceil(total / MAP_MAX_FANOUT))
+        chunks = pack_evidence_chunks(units, chunk_tokens)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(MAP_CONCURRENCY, len(chunks)))) as executor:
+            summaries = list(executor.map(lambda chunk: summarize_chunk(category, chunk), chunks))
+        reduced = sum(estimate_tokens(summary) for summary in summaries)
+        print(
+            f"🗂️ {category} map 단계 {level}: 약 {total:,}토큰 → 청크 {len(chunks)}개 요약 "
+            f"약 {reduced:,}토큰 ({time.perf_counter() - started:.1f}초)"
+        )
+        total, units = reduced, summaries
+        if total <= SYNTHESIS_INPUT_TOKEN_BUDGET or len(summaries) <= 1:
+            break
+    return "\n\n".join(units)
+
+
+# ==================== 키워드 단위 종합 메모이제이션 ====================
+SYNTHESIS_MEMO_PATH = os.getenv("SYNTHESIS_MEMO_PATH", f"{STATE_FILE_PREFIX}synthesis_memo.json")
+SYNTHESIS_MEMO_MAX_ENTRIES = 2000
+SYNTHESIS_UNIT_VERSION = 2  # 단위 프롬프트/스키마를 바꾸면 올려서 기존 캐시 무효화
+CATEGORY_MAX_INSIGHTS = 8  # 병합 후 카테고리에 남길 인사이트 수
+INSIGHT_MERGE_SIMILARITY = 0.6  # 주장 토큰 Jaccard가 이 이상이면 같은 인사이트로 병합
+
+unit_prompt = ChatPromptTemplate.from_messages([
+    ("system", """당신은 Physical AI 전문 분석가입니다.
+검색 키워드 하나에 대한 Tavily 답변과 검색 결과에서 핵심 인사이트 1-3개를 추출하세요.
+수치(값, 단위, 연도)와 기업/제품명, 출처는 원문 그대로 보존하고 추측은 넣지 마세요."""),
+    ("user", """카테고리: {category}
+검색 키워드: {keyword}
+
+Tavily AI 답변:
+{answer}
+
+수치 팩트 테이블:
+{facts}
+
+검색 결과:
+{results}""")
+])
+
+
+class SynthesisMemo:
+    """키워드 결과 해시 -> 키워드 단위 종합 결과를 로컬 JSON 파일에 보관"""
+
+    def __init__(self, path: str = SYNTHESIS_MEMO_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+        except (OSError, ValueError):
+            loaded = {}
+        self.entries: Dict[str, Dict[str, Any]] = loaded if isinstance(loaded, dict) else {}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            entry["used_at"] = time.time()
+            return entry["value"]
+
+    def put_many(self, values: Dict[str, Any]) -> None:
+        if not values:
+            return
+        with self._lock:
+            now = time.time()
+            for key, value in values.items():
+                self.entries[key] = {"value": value, "used_at": now}
+            for key in sorted(self.entries, key=lambda key: self.entries[key]["used_at"])[:max(0, len(self.entries) - SYNTHESIS_MEMO_MAX_ENTRIES)]:
+                del self.entries[key]
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError as exc:
+                print(f"⚠️ 종합 캐시 저장 실패: {exc}")
+
+
+SYNTHESIS_MEMO = SynthesisMemo()
+
+
+def keyword_evidence_fingerprint(entry: Dict[str, Any]) -> str:
+    """키워드 하나의 자르기 전 근거(답변 + URL 순으로 정렬한 결과 본문) 해시. 결과 순서나 다른 키워드와 무관"""
+    digest = hashlib.sha1(entry.get("answer", "").encode("utf-8"))
+    for url, content in sorted((result.get("url", ""), result.get("content", "")) for result in entry.get("results", [])):
+        digest.update(b"\0" + url.encode("utf-8") + b"\0" + content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def synthesis_unit_key(category: str, item: Dict[str, Any]) -> str:
+    """키워드 하나의 근거 식별값(카테고리 후처리 전에 계산)과 출력 모드에 대한 해시"""
+    payload = {
+        "version": SYNTHESIS_UNIT_VERSION,
+        "mode": SYNTHESIS_OUTPUT_MODE,
+        "category": category,
+        "keyword": item.get("keyword", ""),
+        "evidence": item.get("evidence_fingerprint") or keyword_evidence_fingerprint(item),
+    }
+    return hashlib.sha1(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def synthesize_keyword_unit(category: str, item: Dict[str, Any]) -> Any:
+    """키워드 하나의 근거만으로 종합 (structured 모드는 CategoryInsights dict)"""
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+    results = "\n".join(
+        f"- {result.get('title', '')} ({result.get('url', '')}): {result.get('content', '')}"
+        for result in item.get("results", [])
+    )
+    messages = unit_prompt.format_messages(
+        category=category,
+        keyword=item.get("keyword", ""),
+        answer=item.get("answer") or "(없음)",
+        facts=format_fact_table(collect_numeric_facts([item], category)),
+        results=truncate_text(results, SYNTHESIS_INPUT_TOKEN_BUDGET * 3) or "(없음)",
+    )
+    if SYNTHESIS_OUTPUT_MODE == "structured":
+        try:
+            return llm.with_structured_output(CategoryInsights).invoke(messages).dict()
+        except Exception as exc:
+            print(f"⚠️ {category}/{item.get('keyword', '')} 구조화 종합 실패, 자유 서술로 대체: {exc}")
+    return llm.invoke(messages).content
+
+
+def merge_synthesis_units(units: List[Any]) -> Any:
+    """키워드 단위 결과를 LLM 호출 없이 병합: 비슷한 주장은 합치고 근거가 많은 인사이트 순으로 상위 N개"""
+    if not any(isinstance(unit, dict) for unit in units):
+        return "\n\n".join(unit for unit in units if unit)
+
+    merged: List[Dict[str, Any]] = []
+    claim_tokens: List[set] = []
+    summaries: List[str] = []
+    for unit in units:
+        if isinstance(unit, dict):
+            insights = unit.get("insights", [])
+            if unit.get("summary"):
+                summaries.append(unit["summary"])
+        else:
+            insights = [{"claim": truncate_text(unit, 300)}] if unit else []
+        for insight in insights:
+            tokens = set(tokenize_text(insight.get("claim", "")))
+            match = next(
+                (index for index, other in enumerate(claim_tokens)
+                 if tokens and len(tokens & other) / len(tokens | other) >= INSIGHT_MERGE_SIMILARITY),
+                None,
+            )
+            if match is None:
+                merged.append({"claim": insight.get("claim", ""), "support": 1})
+                merged[-1].update({field: list(insight.get(field, [])) for field in ("figures", "entities", "sources", "sections")})
+                claim_tokens.append(tokens)
+                continue
+            target = merged[match]
+            target["support"] += 1
+            for field in ("figures", "entities", "sources", "sections"):
+                target[field] += [value for value in insight.get(field, []) if value not in target[field]]
+
+    ranked = sorted(merged, key=lambda insight: (-insight["support"], -len(insight["figures"]), -len(insight["sources"])))
+    summary, _ = summarize_answers("\n".join(summaries), target_chars=300)
+    return {
+        "summary": " ".join(line[2:] for line in summary.splitlines()),
+        "insights": [
+            {key: value for key, value in insight.items() if key != "support"}
+            for insight in ranked[:CATEGORY_MAX_INSIGHTS]
+        ],
+    }
+
+
+def synthesize_category_incremental(category: str, detailed_data: List[Dict]) -> Any:
+    """근거가 바뀐 키워드만 LLM으로 종합하고, 캐시된 단위와 함께 로컬 병합"""
+    items = [item for item in detailed_data if item.get("results") or item.get("answer")]
+    keys = [synthesis_unit_key(category, item) for item in items]
+    units: Dict[str, Any] = {}
+    for key in keys:
+        cached = SYNTHESIS_MEMO.get(key)
+        if cached is not None:
+            units[key] = cached
+    fresh = [(key, item) for key, item in zip(keys, items) if key not in units]
+    if fresh:
+        with ThreadPoolExecutor(max_workers=max(1, min(MAP_CONCURRENCY, len(fresh)))) as executor:
+            computed = dict(zip(
+                [key for key, _ in fresh],
+                executor.map(lambda pair: synthesize_keyword_unit(category, pair[1]), fresh),
+            ))
+        SYNTHESIS_MEMO.put_many(computed)
+        units.update(computed)
+    print(f"🧩 {category} 키워드 단위 종합: 캐시 재사용 {len(items) - len(fresh)}/{len(items)}, LLM 호출 {len(fresh)}건")
+    return merge_synthesis_units([units[key] for key in keys])
+
+
+# ==================== 로컬 리뷰 사전 점수 ====================
+REVIEW_PASS_SCORE = 7.0
+PRESCORE_ENABLED = True
+REVIEW_CALIBRATION_PATH = os.getenv("REVIEW_CALIBRATION_PATH", f"{STATE_FILE_PREFIX}review_calibration.json")
+REVIEW_CALIBRATION_MAX_SAMPLES = 300
+PRESCORE_MIN_SAMPLES = 10  # 보정 표본이 이보다 적으면 항상 LLM 리뷰
+PRESCORE_CONFIDENCE_Z = 2.0  # 예측 점수가 통과 기준에서 오차(RMSE)의 이 배수 이상 떨어져야 LLM 리뷰 생략
+PRESCORE_AUDIT_RATE = 0.2  # 생략 가능한 리뷰 중 이 비율은 LLM으로 검토해 보정 표본을 계속 갱신 (드리프트 감지)
+PRESCORE_RIDGE = 0.1
+PRESCORE_JARGON_TARGET = 6  # 이 개수 이상의 전문 용어를 쓰면 커버리지 만점
+PRESCORE_FEATURES = ["numeric", "citations", "balance", "jargon", "grounded"]
+# 특징 -> 리뷰 평가 기준 (로컬 피드백을 LLM 리뷰와 같은 형식으로 만들어 섹션 개선에 재사용)
+PRESCORE_FEATURE_CRITERIA = {
+    "numeric": "B. 데이터 정확성",
+    "citations": "B. 데이터 정확성",
+    "grounded": "B. 데이터 정확성",
+    "balance": "C. 구조 논리성",
+    "jargon": "E. 전문성",
+}
+JARGON_TERMS = [
+    "vla", "foundation model", "edge ai", "amr", "agv", "cagr", "roi", "kpi", "digital twin", "sim-to-real",
+    "world model", "humanoid", "cobot", "lidar", "teleoperation", "reinforcement learning", "휴머노이드", "디지털 트윈",
+]
+CITATION_PATTERN = re.compile(
+    r"https?://|출처|according to|\([^()]{0,40}(?:19|20)\d{2}[^()]{0,10}\)|(?:IDC|Gartner|McKinsey|Goldman Sachs|IFR|Statista|Market\.us|MarketsandMarkets)\b",
+    re.IGNORECASE,
+)
+
+
+def report_features(state: AgentState) -> Dict[str, float]:
+    """수치 밀도, 인용 수, 섹션 길이 균형, 전문 용어 커버리지, 근거 확인 비율 (각 0~1)"""
+    sections = [text for text in (state.get("report_sections") or {}).values() if text]
+    if not sections:
+        sections = [report_claim_text(state.get("final_report", ""))]
+    body = "\n".join(sections)
+    lengths = [len(text) for text in sections]
+    mean_length = sum(lengths) / len(lengths)
+    deviation = math.sqrt(sum((length - mean_length) ** 2 for length in lengths) / len(lengths))
+    lowered = body.lower()
+    grounding = state.get("search_context", {}).get("grounding") or {}
+    return {
+        "numeric": min(1.0, len(NUMBER_PATTERN.findall(body)) / max(1, len(body)) * 1000 / 10),
+        "citations": sum(1 for text in sections if CITATION_PATTERN.search(text)) / len(sections),
+        "balance": max(0.0, 1.0 - deviation / mean_length) if mean_length else 0.0,
+        "jargon": min(1.0, sum(1 for term in JARGON_TERMS if term in lowered) / PRESCORE_JARGON_TARGET),
+        "grounded": grounding.get("ratio", 0.5),
+    }
+
+
+def solve_linear_system(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """부분 피벗 가우스 소거 (작은 정규방정식용)"""
+    size = len(vector)
+    augmented = [row[:] + [value] for row, value in zip(matrix, vector)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(augmented[row][column]))
+        augmented[column], augmented[pivot] = augmented[pivot], augmented[column]
+        if abs(augmented[column][column]) < 1e-12:
+            continue
+        for row in range(size):
+            if row != column:
+                factor = augmented[row][column] / augmented[column][column]
+                augmented[row] = [a - factor * b for a, b in zip(augmented[row], augmented[column])]
+    return [augmented[i][size] / augmented[i][i] if abs(augmented[i][i]) >= 1e-12 else 0.0 for i in range(size)]
+
+
+class ReviewCalibration:
+    """LLM 리뷰 점수를 목표로 보고서 특징에 대한 릿지 회귀를 적합해 로컬 점수와 오차 추정"""
+
+    def __init__(self, path: str = REVIEW_CALIBRATION_PATH):
+        self.path = path
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+        except (OSError, ValueError):
+            loaded = []
+        self.samples: List[Dict[str, Any]] = loaded if isinstance(loaded, list) else []
+        self.weights: Optional[List[float]] = None
+        self.rmse = float("inf")
+        self._fit()
+
+    def _row(self, features: Dict[str, float]) -> List[float]:
+        return [1.0] + [float(features.get(name, 0.0)) for name in PRESCORE_FEATURES]
+
+    def _fit(self) -> None:
+        if len(self.samples) < PRESCORE_MIN_SAMPLES:
+            self.weights, self.rmse = None, float("inf")
+            return
+        rows = [self._row(sample["features"]) for sample in self.samples]
+        targets = [float(sample["score"]) for sample in self.samples]
+        size = len(rows[0])
+        gram = [
+            [sum(row[i] * row[j] for row in rows) + (PRESCORE_RIDGE if i == j and i > 0 else 0.0) for j in range(size)]
+            for i in range(size)
+        ]
+        moment = [sum(row[i] * target for row, target in zip(rows, targets)) for i in range(size)]
+        self.weights = solve_linear_system(gram, moment)
+        residuals = [target - self._predict_row(row) for row, target in zip(rows, targets)]
+        dof = max(1, len(rows) - size)
+        self.rmse = math.sqrt(sum(residual ** 2 for residual in residuals) / dof)
+
+    def _predict_row(self, row: List[float]) -> float:
+        return sum(weight * value for weight, value in zip(self.weights, row))
+
+    def predict(self, features: Dict[str, float]) -> Optional[float]:
+        if self.weights is None:
+            return None
+        return max(0.0, min(10.0, self._predict_row(self._row(features))))
+
+    def is_confident(self, score: Optional[float]) -> bool:
+        return score is not None and abs(score - REVIEW_PASS_SCORE) >= PRESCORE_CONFIDENCE_Z * self.rmse
+
+    def add(self, features: Dict[str, float], score: float) -> None:
+        self.samples = (self.samples + [{"features": features, "score": score}])[-REVIEW_CALIBRATION_MAX_SAMPLES:]
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.samples, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            print(f"⚠️ 리뷰 보정 데이터 저장 실패: {exc}")
+        self._fit()
+
+
+REVIEW_CALIBRATION = ReviewCalibration()
+
+
+def format_local_review(score: float, features: Dict[str, float], rmse: float) -> str:
+    """로컬 점수를 LLM 리뷰 응답 형식으로 표현 (세부 평가는 특징별 20점 환산)"""
+    criteria: Dict[str, List[str]] = {}
+    for name, criterion in PRESCORE_FEATURE_CRITERIA.items():
+        criteria.setdefault(criterion, []).append(name)
+    labels = {"numeric": "수치 밀도", "citations": "인용 섹션 비율", "balance": "섹션 길이 균형", "jargon": "전문 용어 커버리지", "grounded": "근거 확인 비율"}
+    lines = [f"점수: {score:.1f}/10 (로컬 사전 점수, 오차 ±{rmse:.1f})", "", "세부 평가:"]
+    for criterion, names in criteria.items():
+        value = sum(features[name] for name in names) / len(names)
+        detail = ", ".join(f"{labels[name]} {features[name]:.0%}" for name in names)
+        lines.append(f"- {criterion}: {value * 20:.0f}/20점 - {detail}")
+    return "\n".join(lines)
+
+
 # ==================== 노드 함수들 ====================
 
 def planning_node(state: AgentState) -> AgentState:
@@ -788,16 +3279,15 @@ def planning_node(state: AgentState) -> AgentState:
         plan = planning_chain.invoke({
             "query": state["user_query"]
         })
-        state["research_plan"] = {
-            "market": list(plan.market.search_keywords),
-            "tech": list(plan.tech.search_keywords),
-            "industry": list(plan.industry.search_keywords),
-            "company": list(plan.company.search_keywords),
-            "challenge": list(plan.challenge.search_keywords)
-        }
+        state["research_plan"] = {}
         state["search_context"]["plan_overview"] = plan.plan_overview
-        for area in ("market", "tech", "industry", "company", "challenge"):
-            area_plan = getattr(plan, area)
+        for area, spec in RESEARCH_CATEGORIES.items():
+            area_plan = getattr(plan, area, None)
+            if area_plan is None:
+                # LLM 계획 스키마에 없는 등록 카테고리는 기본 키워드 사용
+                state["research_plan"][area] = list(spec["default_keywords"])
+                continue
+            state["research_plan"][area] = list(area_plan.search_keywords)
             state["search_context"][f"{area}_focus"] = area_plan.focus_question
             print(f"🔖 {area} 핵심 질문: {area_plan.focus_question}")
         state["messages"].append("✅ LLM 기반 리서치 계획 수립 완료")
@@ -808,327 +3298,19 @@ def planning_node(state: AgentState) -> AgentState:
         print(f"🧭 계획 요약: {overview}")
     except Exception as exc:
         print(f"리서치 계획 생성 오류: {exc}")
-        state["research_plan"] = {category: list(keywords) for category, keywords in DEFAULT_RESEARCH_PLAN.items()}
+        state["research_plan"] = {category: list(spec["default_keywords"]) for category, spec in RESEARCH_CATEGORIES.items()}
         state["search_context"]["plan_overview"] = "사전 정의된 기본 리서치 계획 사용"
         state["messages"].append("⚠️ 기본 리서치 계획으로 대체했습니다")
+    apply_search_budget(state)
     return state
 
-def market_research_node(state: AgentState) -> AgentState:
-    """시장 데이터 수집 with Tavily"""
-    tavily_search = get_tavily_search(max_results=5)
-    market_data = []
-    search_contexts = []
-    
-    for keyword in state["research_plan"]["market"]:
-        try:
-            # Tavily 검색 실행
-            query = strengthen_keyword("market", keyword, state)
-            raw_results = execute_tavily_query(tavily_search, query)
-            answer_value = raw_results.get("answer", "") or ""
-            results_list = raw_results.get("results", []) or []
-            error_message = raw_results.get("error", "")
-            if error_message and not results_list:
-                search_contexts.append(f"[{keyword}] ERROR: {error_message}")
-            if isinstance(results_list, dict):
-                results_list = [results_list]
-            elif not isinstance(results_list, list):
-                results_list = []
-            
-
-            # 결과 처리 (Tavily는 구조화된 Dict 반환)
-            processed_results = []
-            for result in results_list[:2]:
-                if not isinstance(result, dict):
-                    continue
-                processed_results.append({
-                    "url": result.get("url", ""),
-                    "title": result.get("title", ""),
-                    "content": result.get("content", "")[:250],  # 500자 제한
-                    "score": result.get("score", 0.0)  # 관련성 점수
-                })
-            
-            market_data.append({
-                "keyword": keyword,
-                "query": query,
-                "results": processed_results,
-                "error": raw_results.get("error", ""),
-                "answer": answer_value  # Tavily AI 답변
-            })
-            
-            # AI 답변 컨텍스트 저장
-            if answer_value:
-                search_contexts.append(f"[{keyword}]: {answer_value}")
-                
-        except Exception as e:
-            print(f"검색 오류: {keyword} - {e}")
-            market_data.append({
-                "keyword": keyword,
-                "results": [],
-                "answer": ""
-            })
-    
-    state["market_data"] = market_data
-    
-    # search_context 초기화 (처음 실행시)
-    if "search_context" not in state:
-        state["search_context"] = {}
-    state["search_context"]["market"] = "\n".join(search_contexts)
-    
-    state["messages"].append(f"✅ 시장 데이터 {len(market_data)}건 수집 (Tavily Advanced)")
-    return state
-
-def tech_research_node(state: AgentState) -> AgentState:
-    """기술 동향 수집 with Tavily"""
-    tavily_search = get_tavily_search(max_results=5)
-    tech_data = []
-    search_contexts = []
-    
-    for keyword in state["research_plan"]["tech"]:
-        try:
-            query = strengthen_keyword("tech", keyword, state)
-            raw_results = execute_tavily_query(tavily_search, query)
-            answer_value = raw_results.get("answer", "") or ""
-            results_list = raw_results.get("results", []) or []
-            error_message = raw_results.get("error", "")
-            if error_message and not results_list:
-                search_contexts.append(f"[{keyword}] ERROR: {error_message}")
-            if isinstance(results_list, dict):
-                results_list = [results_list]
-            elif not isinstance(results_list, list):
-                results_list = []
-            
-
-            processed_results = []
-            for result in results_list[:2]:
-                if not isinstance(result, dict):
-                    continue
-                processed_results.append({
-                    "url": result.get("url", ""),
-                    "title": result.get("title", ""),
-                    "content": result.get("content", "")[:250],
-                    "score": result.get("score", 0.0)
-                })
-            
-            tech_data.append({
-                "keyword": keyword,
-                "query": query,
-                "results": processed_results,
-                "error": raw_results.get("error", ""),
-                "answer": answer_value
-            })
-            
-            if answer_value:
-                search_contexts.append(f"[{keyword}]: {answer_value}")
-                
-        except Exception as e:
-            print(f"검색 오류: {keyword} - {e}")
-            tech_data.append({
-                "keyword": keyword,
-                "results": [],
-                "answer": ""
-            })
-    
-    state["tech_data"] = tech_data
-    state["search_context"]["tech"] = "\n".join(search_contexts)
-    state["messages"].append(f"✅ 기술 데이터 {len(tech_data)}건 수집 (Tavily Advanced)")
-    return state
-
-def industry_research_node(state: AgentState) -> AgentState:
-    """산업별 사례 수집 with Tavily"""
-    tavily_search = get_tavily_search(max_results=5)
-    industry_data = []
-    search_contexts = []
-    
-    for keyword in state["research_plan"]["industry"]:
-        try:
-            query = strengthen_keyword("industry", keyword, state)
-            raw_results = execute_tavily_query(tavily_search, query)
-            answer_value = raw_results.get("answer", "") or ""
-            results_list = raw_results.get("results", []) or []
-            error_message = raw_results.get("error", "")
-            if error_message and not results_list:
-                search_contexts.append(f"[{keyword}] ERROR: {error_message}")
-            if isinstance(results_list, dict):
-                results_list = [results_list]
-            elif not isinstance(results_list, list):
-                results_list = []
-            
-
-            processed_results = []
-            for result in results_list[:2]:
-                if not isinstance(result, dict):
-                    continue
-                processed_results.append({
-                    "url": result.get("url", ""),
-                    "title": result.get("title", ""),
-                    "content": result.get("content", "")[:250],
-                    "score": result.get("score", 0.0)
-                })
-            
-            industry_data.append({
-                "keyword": keyword,
-                "query": query,
-                "results": processed_results,
-                "error": raw_results.get("error", ""),
-                "answer": answer_value
-            })
-            
-            if answer_value:
-                search_contexts.append(f"[{keyword}]: {answer_value}")
-                
-        except Exception as e:
-            print(f"검색 오류: {keyword} - {e}")
-            industry_data.append({
-                "keyword": keyword,
-                "results": [],
-                "answer": ""
-            })
-    
-    state["industry_data"] = industry_data
-    state["search_context"]["industry"] = "\n".join(search_contexts)
-    state["messages"].append(f"✅ 산업 데이터 {len(industry_data)}건 수집 (Tavily Advanced)")
-    return state
-
-def company_research_node(state: AgentState) -> AgentState:
-    """기업 분석 데이터 수집 with Tavily"""
-    tavily_search = get_tavily_search(max_results=5)
-    company_data = []
-    search_contexts = []
-    
-    for keyword in state["research_plan"]["company"]:
-        try:
-            query = strengthen_keyword("company", keyword, state)
-            raw_results = execute_tavily_query(tavily_search, query)
-            answer_value = raw_results.get("answer", "") or ""
-            results_list = raw_results.get("results", []) or []
-            error_message = raw_results.get("error", "")
-            if error_message and not results_list:
-                search_contexts.append(f"[{keyword}] ERROR: {error_message}")
-            if isinstance(results_list, dict):
-                results_list = [results_list]
-            elif not isinstance(results_list, list):
-                results_list = []
-            
-
-            processed_results = []
-            for result in results_list[:2]:
-                if not isinstance(result, dict):
-                    continue
-                processed_results.append({
-                    "url": result.get("url", ""),
-                    "title": result.get("title", ""),
-                    "content": result.get("content", "")[:250],
-                    "score": result.get("score", 0.0)
-                })
-            
-            company_data.append({
-                "keyword": keyword,
-                "query": query,
-                "results": processed_results,
-                "error": raw_results.get("error", ""),
-                "answer": answer_value
-            })
-            
-            if answer_value:
-                search_contexts.append(f"[{keyword}]: {answer_value}")
-                
-        except Exception as e:
-            print(f"검색 오류: {keyword} - {e}")
-            company_data.append({
-                "keyword": keyword,
-                "results": [],
-                "answer": ""
-            })
-    
-    state["company_data"] = company_data
-    state["search_context"]["company"] = "\n".join(search_contexts)
-    state["messages"].append(f"✅ 기업 데이터 {len(company_data)}건 수집 (Tavily Advanced)")
-    return state
-
-def challenge_research_node(state: AgentState) -> AgentState:
-    """도전과제 데이터 수집 with Tavily"""
-    tavily_search = get_tavily_search(max_results=5)
-    challenge_data = []
-    search_contexts = []
-    
-    for keyword in state["research_plan"]["challenge"]:
-        try:
-            query = strengthen_keyword("challenge", keyword, state)
-            raw_results = execute_tavily_query(tavily_search, query)
-            answer_value = raw_results.get("answer", "") or ""
-            results_list = raw_results.get("results", []) or []
-            error_message = raw_results.get("error", "")
-            if error_message and not results_list:
-                search_contexts.append(f"[{keyword}] ERROR: {error_message}")
-            if isinstance(results_list, dict):
-                results_list = [results_list]
-            elif not isinstance(results_list, list):
-                results_list = []
-            
-
-            processed_results = []
-            for result in results_list[:2]:
-                if not isinstance(result, dict):
-                    continue
-                processed_results.append({
-                    "url": result.get("url", ""),
-                    "title": result.get("title", ""),
-                    "content": result.get("content", "")[:250],
-                    "score": result.get("score", 0.0)
-                })
-            
-            challenge_data.append({
-                "keyword": keyword,
-                "query": query,
-                "results": processed_results,
-                "error": raw_results.get("error", ""),
-                "answer": answer_value
-            })
-            
-            if answer_value:
-                search_contexts.append(f"[{keyword}]: {answer_value}")
-                
-        except Exception as e:
-            print(f"검색 오류: {keyword} - {e}")
-            challenge_data.append({
-                "keyword": keyword,
-                "results": [],
-                "answer": ""
-            })
-    
-    state["challenge_data"] = challenge_data
-    state["search_context"]["challenge"] = "\n".join(search_contexts)
-    state["messages"].append(f"✅ 도전과제 데이터 {len(challenge_data)}건 수집 (Tavily Advanced)")
-    return state
-
-def synthesis_node(state: AgentState) -> AgentState:
-    """수집된 데이터 통합 및 분석 (Tavily 답변 활용)"""
+def synthesize_category(category: str, tavily_answers: str, detailed_data: List[Dict]) -> Any:
+    """카테고리 하나의 Tavily 답변과 상세 결과를 LLM으로 종합.
+    structured 모드는 CategoryInsights dict, text 모드(또는 구조화 실패 시)는 자유 서술 문자열 반환"""
+    if SYNTHESIS_MODE == "incremental":
+        return synthesize_category_incremental(category, detailed_data)
     llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
     
-    # Tavily AI 답변을 우선 활용
-    all_data = {
-        "market": {
-            "tavily_answers": state["search_context"].get("market", ""),
-            "detailed_data": state["market_data"]
-        },
-        "tech": {
-            "tavily_answers": state["search_context"].get("tech", ""),
-            "detailed_data": state["tech_data"]
-        },
-        "industry": {
-            "tavily_answers": state["search_context"].get("industry", ""),
-            "detailed_data": state["industry_data"]
-        },
-        "company": {
-            "tavily_answers": state["search_context"].get("company", ""),
-            "detailed_data": state["company_data"]
-        },
-        "challenge": {
-            "tavily_answers": state["search_context"].get("challenge", ""),
-            "detailed_data": state["challenge_data"]
-        }
-    }
-    
     prompt = ChatPromptTemplate.from_messages([
         ("system", """당신은 Physical AI 전문 분석가입니다.
         Tavily AI가 제공한 답변과 상세 데이터를 종합하여 핵심 인사이트를 추출하세요.
@@ -1138,47 +3320,71 @@ def synthesis_node(state: AgentState) -> AgentState:
 Tavily AI 답변:
 {tavily_answers}
 
-상세 검색 결과 (상위 결과):
+수치 팩트 테이블 (검색 결과에서 규칙 기반 추출, 수치는 이 표의 값을 우선 인용):
+{facts}
+
+상세 검색 결과 (상위 결과 또는 전체 결과의 청크별 요약):
 {detailed_data}
 
 위 정보를 바탕으로 핵심 인사이트를 추출하세요.""")
     ])
     
+    # 입력이 reduce 예산을 넘으면 전체 결과를 청크별로 요약한 뒤 종합 (map-reduce)
+    units = category_evidence_units(detailed_data)
+    evidence_tokens = sum(estimate_tokens(unit) for unit in units)
+    map_reduce = SYNTHESIS_MODE == "map_reduce" or (SYNTHESIS_MODE == "auto" and evidence_tokens > SYNTHESIS_INPUT_TOKEN_BUDGET)
+    if map_reduce and units:
+        detailed_summary = [map_reduce_evidence(category, units)]
+    else:
+        detailed_summary = select_detail_snippets(detailed_data)
+    
+    messages = prompt.format_messages(
+        category=category,
+        tavily_answers=tavily_answers,
+        facts=format_fact_table(collect_numeric_facts(detailed_data, category)),
+        detailed_data="\n".join(detailed_summary)
+    )
+    if SYNTHESIS_OUTPUT_MODE == "structured":
+        try:
+            return llm.with_structured_output(CategoryInsights).invoke(messages).dict()
+        except Exception as exc:
+            print(f"⚠️ {category} 구조화 종합 실패, 자유 서술로 대체: {exc}")
+    response = llm.invoke(messages)
+    return response.content
+
+def synthesis_node(state: AgentState) -> AgentState:
+    """수집된 데이터 통합 및 분석 (Tavily 답변 활용). 리서치 중 스트리밍 종합된 카테고리는 재사용"""
+    streamed = set(state["search_context"].get("streamed_synthesis", []))
+    
+    # Tavily AI 답변을 우선 활용
     synthesized = {}
-    for category, data in all_data.items():
-        # 상세 데이터 요약 (상위 3개 결과만)
-        detailed_summary = []
-        for item in data["detailed_data"][:3]:
-            if item.get("results"):
-                top_result = item["results"][0]
-                detailed_summary.append(
-                    f"- {top_result.get('title', '')}: {top_result.get('content', '')[:200]}"
-                )
-        
-        response = llm.invoke(
-            prompt.format_messages(
-                category=category,
-                tavily_answers=data["tavily_answers"],
-                detailed_data="\n".join(detailed_summary)
-            )
+    for category in RESEARCH_CATEGORIES:
+        if category in streamed and category in state.get("synthesized_data", {}):
+            synthesized[category] = state["synthesized_data"][category]
+            continue
+        synthesized[category] = synthesize_category(
+            category,
+            state["search_context"].get(f"{category}_digest", state["search_context"].get(category, "")),
+            get_category_data(state, category),
         )
-        synthesized[category] = response.content
     
     state["synthesized_data"] = synthesized
-    state["messages"].append("✅ 데이터 통합 분석 완료 (Tavily AI 답변 활용)")
+    state["search_context"]["streamed_synthesis"] = []  # 다음 research_more 루프에서 재사용되지 않도록 초기화
+    state["messages"].append(
+        f"✅ 데이터 통합 분석 완료 (Tavily AI 답변 활용, 스트리밍 종합 {len(streamed)}/{len(synthesized)}개 카테고리)"
+    )
     return state
 
 def quality_check_node(state: AgentState) -> str:
     """   ( )"""
     state.setdefault("search_context", {})
-    categories = ["market", "tech", "industry", "company", "challenge"]
+    categories = list(RESEARCH_CATEGORIES)
     diagnostics: List[str] = []
     failing: List[str] = []
     quality_feedback: Dict[str, List[str]] = {}
 
     for category in categories:
-        data_key = f"{category}_data"
-        entries = state.get(data_key, []) or []
+        entries = get_category_data(state, category) or []
         print(f"품질 검사 - {category}: {len(entries)} 항목 분석 중...")
         print(entries[:2])  # 처음 2개 항목 출력
         total = len(entries)
@@ -1225,95 +3431,127 @@ def quality_check_node(state: AgentState) -> str:
     state["iteration_count"] = 0
     return "generate_report"
 
-def report_generation_node(state: AgentState) -> AgentState:
-    """보고서 초안 생성 - 공식적이고 정형화된 트렌드 분석 보고서 양식"""
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
+REPORT_SECTION_TITLES = {
+    "executive_summary": "핵심 요약",
+    "market_overview": "시장 전망",
+    "technology_trends": "기술 트렌드",
+    "industry_applications": "산업별 응용",
+    "key_players": "주요 기업",
+    "challenges": "도전과제",
+    "forecast": "향후 5년 전망",
+    "recommendations": "전략적 권고사항",
+    "conclusion": "결론"
+}
 
-    sections = {
-        "executive_summary": "핵심 요약",
-        "market_overview": "시장 전망",
-        "technology_trends": "기술 트렌드",
-        "industry_applications": "산업별 응용",
-        "key_players": "주요 기업",
-        "challenges": "도전과제",
-        "forecast": "향후 5년 전망",
-        "recommendations": "전략적 권고사항",
-        "conclusion": "결론"
-    }
 
-    # 섹션별 상세 작성 가이드라인
-    section_guidelines = {
-        "executive_summary": """
-        - 보고서 전체의 핵심 내용을 3-5개의 주요 포인트로 요약
-        - 시장 규모, 성장률(CAGR) 등 핵심 수치를 반드시 포함
-        - 주요 트렌드와 기술 혁신을 간략히 언급
-        - 전략적 시사점을 1-2문장으로 제시
-        """,
-        "market_overview": """
-        - 현재 시장 규모와 예측 시장 규모를 구체적인 금액($)으로 제시
-        - CAGR(연평균 성장률) 수치와 기간 명시
-        - 지역별 시장 비중(북미, 유럽, 아시아태평양 등) 백분율로 제시
-        - 주요 성장 동력(예: 자동화 수요, AI 칩 발전 등)을 3-4가지 나열
-        - 가능한 경우 출처(예: Market.us 2024, IDC 2025) 명시
-        """,
-        "technology_trends": """
-        - 핵심 기술 트렌드를 3-5개 선정하여 각각 상세 설명
-        - 각 기술별로 실제 제품명이나 프로젝트명 언급(예: Google RT-2, NVIDIA Cosmos)
-        - 기술적 성능 개선 수치를 포함(예: 정확도 30% 향상, 지연시간 50ms 단축)
-        - 업계 전문 용어 적극 활용(VLA, AMR, Edge AI, Foundation Model 등)
-        - 각 기술의 산업적 의의와 적용 가능성 설명
-        """,
-        "industry_applications": """
-        - 최소 3개 이상의 주요 산업 분야 다루기(제조, 물류, 헬스케어, 자율주행 등)
-        - 각 산업별로 구체적인 사례 제시(기업명, 프로젝트명 포함)
-        - 정량적 성과 지표 포함(예: 생산성 25% 향상, 물류 처리량 40% 증가)
-        - 실증 데이터나 파일럿 프로젝트 결과 언급
-        - 각 산업에서의 도입 단계(초기/성장/성숙) 평가
-        """,
-        "key_players": """
-        - 주요 기업 5-7개를 선정하여 각각의 전략과 제품 소개
-        - 최근 투자 유치 금액, 파트너십, M&A 정보 포함
-        - 각 기업의 기술적 차별점과 시장 포지셔닝 설명
-        - 스타트업과 대기업을 구분하여 분석
-        - 주요 제품의 구체적인 스펙이나 성능 지표 언급
-        """,
-        "challenges": """
-        - 기술적 과제(예: 배터리, 정밀도, 안전성) 3-4가지
-        - 비즈니스 장벽(예: 높은 초기 비용, ROI 불확실성) 2-3가지
-        - 규제 및 윤리적 이슈(예: 안전 규제, 일자리 대체) 1-2가지
-        - 각 과제에 대한 현재 해결 시도나 대안 언급
-        - 향후 해결 전망과 예상 시점 제시
-        """,
-        "forecast": """
-        - 향후 5년간의 단계적 발전 시나리오 제시
-        - 연도별 주요 마일스톤 예측(예: 2026년 대량 배포, 2028년 표준화)
-        - 시장 침투율 전망(예: 2030년까지 제조업의 30% 도입)
-        - 기술 성숙도 로드맵(초기→성장→성숙 단계)
-        - 낙관적/보수적 시나리오 구분 제시
-        """,
-        "recommendations": """
-        - 3단계 실행 로드맵 제시(Phase 1/2/3, 각 단계별 기간 명시)
-        - 각 단계별 예상 투자 규모($50K-$2M+ 등 구체적 범위)
-        - 핵심 파트너십 전략(구체적인 벤더명이나 SI 업체명 제시)
-        - 인재 확보 계획(직무, 인원, 예상 연봉 범위 포함)
-        - 각 단계별 기대 효과와 ROI 목표 제시
-        - 성공 측정 지표(KPI) 제안
-        """,
-        "conclusion": """
-        - 보고서의 핵심 메시지를 3-4문장으로 요약
-        - Physical AI의 전략적 중요성 강조
-        - 조직이 취해야 할 즉각적 행동 1-2가지 제시
-        - 미래 전망에 대한 간결한 견해 제시
-        """
-    }
+# 섹션별 상세 작성 가이드라인
+SECTION_GUIDELINES = {
+    "executive_summary": """
+    - 보고서 전체의 핵심 내용을 3-5개의 주요 포인트로 요약
+    - 시장 규모, 성장률(CAGR) 등 핵심 수치를 반드시 포함
+    - 주요 트렌드와 기술 혁신을 간략히 언급
+    - 전략적 시사점을 1-2문장으로 제시
+    """,
+    "market_overview": """
+    - 현재 시장 규모와 예측 시장 규모를 구체적인 금액($)으로 제시
+    - CAGR(연평균 성장률) 수치와 기간 명시
+    - 지역별 시장 비중(북미, 유럽, 아시아태평양 등) 백분율로 제시
+    - 주요 성장 동력(예: 자동화 수요, AI 칩 발전 등)을 3-4가지 나열
+    - 가능한 경우 출처(예: Market.us 2024, IDC 2025) 명시
+    """,
+    "technology_trends": """
+    - 핵심 기술 트렌드를 3-5개 선정하여 각각 상세 설명
+    - 각 기술별로 실제 제품명이나 프로젝트명 언급(예: Google RT-2, NVIDIA Cosmos)
+    - 기술적 성능 개선 수치를 포함(예: 정확도 30% 향상, 지연시간 50ms 단축)
+    - 업계 전문 용어 적극 활용(VLA, AMR, Edge AI, Foundation Model 등)
+    - 각 기술의 산업적 의의와 적용 가능성 설명
+    """,
+    "industry_applications": """
+    - 최소 3개 이상의 주요 산업 분야 다루기(제조, 물류, 헬스케어, 자율주행 등)
+    - 각 산업별로 구체적인 사례 제시(기업명, 프로젝트명 포함)
+    - 정량적 성과 지표 포함(예: 생산성 25% 향상, 물류 처리량 40% 증가)
+    - 실증 데이터나 파일럿 프로젝트 결과 언급
+    - 각 산업에서의 도입 단계(초기/성장/성숙) 평가
+    """,
+    "key_players": """
+    - 주요 기업 5-7개를 선정하여 각각의 전략과 제품 소개
+    - 최근 투자 유치 금액, 파트너십, M&A 정보 포함
+    - 각 기업의 기술적 차별점과 시장 포지셔닝 설명
+    - 스타트업과 대기업을 구분하여 분석
+    - 주요 제품의 구체적인 스펙이나 성능 지표 언급
+    """,
+    "challenges": """
+    - 기술적 과제(예: 배터리, 정밀도, 안전성) 3-4가지
+    - 비즈니스 장벽(예: 높은 초기 비용, ROI 불확실성) 2-3가지
+    - 규제 및 윤리적 이슈(예: 안전 규제, 일자리 대체) 1-2가지
+    - 각 과제에 대한 현재 해결 시도나 대안 언급
+    - 향후 해결 전망과 예상 시점 제시
+    """,
+    "forecast": """
+    - 향후 5년간의 단계적 발전 시나리오 제시
+    - 연도별 주요 마일스톤 예측(예: 2026년 대량 배포, 2028년 표준화)
+    - 시장 침투율 전망(예: 2030년까지 제조업의 30% 도입)
+    - 기술 성숙도 로드맵(초기→성장→성숙 단계)
+    - 낙관적/보수적 시나리오 구분 제시
+    """,
+    "recommendations": """
+    - 3단계 실행 로드맵 제시(Phase 1/2/3, 각 단계별 기간 명시)
+    - 각 단계별 예상 투자 규모($50K-$2M+ 등 구체적 범위)
+    - 핵심 파트너십 전략(구체적인 벤더명이나 SI 업체명 제시)
+    - 인재 확보 계획(직무, 인원, 예상 연봉 범위 포함)
+    - 각 단계별 기대 효과와 ROI 목표 제시
+    - 성공 측정 지표(KPI) 제안
+    """,
+    "conclusion": """
+    - 보고서의 핵심 메시지를 3-4문장으로 요약
+    - Physical AI의 전략적 중요성 강조
+    - 조직이 취해야 할 즉각적 행동 1-2가지 제시
+    - 미래 전망에 대한 간결한 견해 제시
+    """
+}
 
-    report_sections = {}
+REFINE_MAX_SECTIONS = 3  # 피드백에서 해당 섹션을 특정하지 못했을 때 다시 쓸 섹션 수 (수치 밀도 낮은 순)
+REFINE_CONCURRENCY = 4
+REFINE_CRITERION_THRESHOLD = 15  # 리뷰 세부 평가가 이 점수(/20) 미만인 기준의 관련 섹션을 개선
+MAX_REFINE_ROUNDS = int(os.getenv("MAX_REFINE_ROUNDS", "2"))  # 리뷰/개선 루프 최대 횟수 (리서치 루프와 별도)
+REFINE_MIN_IMPROVEMENT = float(os.getenv("REFINE_MIN_IMPROVEMENT", "0.3"))  # 직전 리뷰 대비 이보다 덜 오르면(하락 포함) 수렴으로 보고 중단
+# 리뷰 평가 기준 -> 주로 책임이 있는 섹션
+CRITERIA_SECTIONS = {
+    "A": ["executive_summary", "industry_applications", "key_players"],
+    "B": ["market_overview", "forecast"],
+    "C": ["executive_summary", "conclusion"],
+    "D": ["recommendations"],
+    "E": ["technology_trends", "key_players"],
+}
+
+
+def generate_section(
+    section_key: str,
+    state: AgentState,
+    evidence_index: EvidenceIndex,
+    fact_table: str,
+    previous: Optional[str] = None,
+    feedback: Optional[str] = None,
+) -> str:
+    """보고서 섹션 하나 생성. previous/feedback을 주면 기존 초안을 피드백에 맞춰 다시 작성"""
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
+    section_title = REPORT_SECTION_TITLES[section_key]
+    guidelines = SECTION_GUIDELINES.get(section_key, "")
+    evidence = format_evidence(evidence_index.search(
+        f"{section_title} {guidelines} {SECTION_EVIDENCE_HINTS.get(section_key, '')}"
+    ))
+    revision_request = "" if previous is None else """
+
+기존 섹션 초안:
+{previous}
 
-    for section_key, section_title in sections.items():
-        guidelines = section_guidelines.get(section_key, "")
+검토 피드백 (이 섹션과 관련된 지적을 반영하고, 근거 없는 수치는 근거 수치로 교체하거나 삭제):
+{feedback}
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", f"""당신은 Physical AI 분야의 시니어 애널리스트입니다.
+기존 초안의 정확한 내용은 유지하면서 피드백을 반영해 섹션 전체를 다시 작성하세요."""
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", f"""당신은 Physical AI 분야의 시니어 애널리스트입니다.
 '{section_title}' 섹션을 공식적이고 정형화된 산업 트렌드 분석 보고서 양식에 맞춰 작성하세요.
 
 **필수 요구사항:**
@@ -1334,36 +3572,98 @@ def report_generation_node(state: AgentState) -> AgentState:
 - 추상적 표현(많은, 빠른, 중요한 등) 지양하고 구체적 표현 사용
 
 이 섹션은 전체 보고서의 일부이므로, 제공된 분석 데이터를 충분히 활용하여 전문성 있고 실행 가능한 내용으로 작성하세요."""),
-            ("user", """분석 데이터:
+        ("user", """분석 데이터:
 {data}
 
+수치 팩트 테이블 (검색 결과에서 추출, 시장 규모/CAGR/투자액은 이 표의 값을 그대로 사용):
+{facts}
+
+관련 근거 (검색 결과 발췌, 수치 인용 시 우선 사용):
+{evidence}
+
 위 데이터에서 추출한 핵심 인사이트를 바탕으로 '{section_title}' 섹션을 작성하세요.
-가능한 모든 구체적인 수치, 기업명, 제품명, 사례를 포함하세요.""")
-        ])
+가능한 모든 구체적인 수치, 기업명, 제품명, 사례를 포함하세요.""" + revision_request)
+    ])
 
-        response = llm.invoke(
-            prompt.format_messages(
-                data=str(state["synthesized_data"]),
-                section_title=section_title,
-                guidelines=guidelines
-            )
-        )
-        report_sections[section_key] = response.content
+    variables = {
+        "data": serialize_insights(state["synthesized_data"], section=section_key),
+        "facts": fact_table,
+        "evidence": evidence,
+        "section_title": section_title,
+        "guidelines": guidelines,
+    }
+    if previous is not None:
+        variables.update(previous=previous, feedback=feedback or "")
+    return llm.invoke(prompt.format_messages(**variables)).content
+
+
+def report_generation_node(state: AgentState) -> AgentState:
+    """보고서 초안 생성 - 공식적이고 정형화된 트렌드 분석 보고서 양식"""
+    report_sections = {}
+    section_seconds: Dict[str, float] = {}
+    evidence_index = build_evidence_index(state)
+    numeric_facts = collect_state_facts(state)
+    fact_table = format_fact_table(numeric_facts)
+    data_chars = [len(serialize_insights(state["synthesized_data"], section=section_key)) for section_key in REPORT_SECTION_TITLES]
+
+    for section_key in REPORT_SECTION_TITLES:
+        started = time.perf_counter()
+        report_sections[section_key] = generate_section(section_key, state, evidence_index, fact_table)
+        section_seconds[section_key] = time.perf_counter() - started
 
     state["report_sections"] = report_sections
-    state["messages"].append("✅ 보고서 초안 생성 완료 (정형화된 트렌드 분석 양식 적용)")
+    state.setdefault("search_context", {})["section_seconds"] = section_seconds
+    state["messages"].append(
+        f"✅ 보고서 초안 생성 완료 (정형화된 트렌드 분석 양식 적용, 근거 색인 {len(evidence_index.docs)}건에서 섹션별 top-{EVIDENCE_TOP_K} 검색, 수치 팩트 {len(numeric_facts)}건, "
+        f"섹션별 분석 데이터 평균 {sum(data_chars) // max(1, len(data_chars)):,}자 / 전체 str() {len(str(state['synthesized_data'])):,}자)"
+    )
     return state
 
+
+def sections_for_feedback(state: AgentState, feedback: str) -> List[str]:
+    """리뷰/근거 검증 피드백이 지적하는 섹션 목록"""
+    sections = state.get("report_sections", {})
+    implicated: List[str] = []
+
+    def add(section_key: str) -> None:
+        if section_key in sections and section_key not in implicated:
+            implicated.append(section_key)
+
+    # 섹션 제목이 직접 언급된 경우
+    for section_key, section_title in REPORT_SECTION_TITLES.items():
+        if section_title in feedback:
+            add(section_key)
+    # 세부 평가 점수가 낮은 기준의 담당 섹션
+    for criterion, score in re.findall(r"([A-E])\.\s*[^:\n]+:\s*(\d+(?:\.\d+)?)\s*/\s*20", feedback):
+        if float(score) < REFINE_CRITERION_THRESHOLD:
+            for section_key in CRITERIA_SECTIONS.get(criterion, []):
+                add(section_key)
+    # 근거 없는 주장이 들어 있는 섹션
+    for claim in state.get("search_context", {}).get("grounding", {}).get("ungrounded", []):
+        sentence = claim["sentence"].rstrip("…")
+        for section_key, text in sections.items():
+            if sentence[:60] and sentence[:60] in re.sub(r"[*_`]", "", text):
+                add(section_key)
+
+    if not implicated:
+        # 특정하지 못하면 수치 밀도가 가장 낮은 섹션부터
+        density = {
+            section_key: len(NUMBER_PATTERN.findall(text)) / max(1, len(text))
+            for section_key, text in sections.items() if section_key != "recommendations"
+        }
+        implicated = sorted(density, key=density.get)[:REFINE_MAX_SECTIONS]
+    return implicated
+
 def extract_sources_from_data(state: AgentState) -> str:
     """수집된 데이터에서 출처 URL 추출"""
     sources = []
     seen_urls = set()
     
-    for category in ["market_data", "tech_data", "industry_data", "company_data", "challenge_data"]:
-        data_list = state.get(category, [])
+    for category in RESEARCH_CATEGORIES:
+        data_list = get_category_data(state, category)
         for item in data_list:
-            results = item.get("results", [])
-            for result in results[:2]:  # 상위 2개 결과만
+            results = [result for result in item.get("results", []) if not result.get("duplicate_of")]
+            for result in results[:2]:  # 상위 2개 결과만 (다른 카테고리 대표 레코드의 중복은 제외)
                 url = result.get("url", "")
                 title = result.get("title", "")
                 if url and url not in seen_urls:
@@ -1486,74 +3786,364 @@ def structure_node(state: AgentState) -> AgentState:
     state["messages"].append("✅ 보고서 구조화 완료 (목차, 결론, 출처, 평가기준 포함)")
     return state
 
-def review_node(state: AgentState) -> AgentState:
-    """보고서 품질 검토"""
+def grounding_check_node(state: AgentState) -> AgentState:
+    """리뷰 전 로컬 근거 검증: 보고서 수치/고유명사가 수집된 검색 결과에 있는지 확인"""
+    context = state.setdefault("search_context", {})
+    context["grounding_route"] = "review"
+    if not GROUNDING_CHECK_ENABLED:
+        return state
+
+    started = time.perf_counter()
+    grounding = check_grounding(state["final_report"], GroundingIndex(build_evidence_index(state)))
+    context["grounding"] = grounding
+    context["grounding_feedback"] = format_grounding_feedback(grounding)
+    print(
+        f"🔎 근거 검증: {grounding['grounded']}/{grounding['claims']}건 확인 "
+        f"({grounding['ratio']:.0%}, {time.perf_counter() - started:.2f}초)"
+    )
+
+    if grounding_needs_refinement(grounding, GROUNDING_SKIP_REVIEW_RATIO) and refinement_possible(state):
+        # 근거가 명백히 부족하면 LLM 리뷰 호출 없이 바로 개선 단계로
+        state["refine_count"] = state.get("refine_count", 0) + 1
+        context["grounding_route"] = "refine"
+        context["review_feedback"] = context["grounding_feedback"]
+    state["messages"].append(
+        f"✅ 근거 검증 완료 (근거 확인 {grounding['ratio']:.0%}, 근거 없는 주장 {grounding['claims'] - grounding['grounded']}건"
+        f"{', 리뷰 생략 후 개선' if context['grounding_route'] == 'refine' else ''})"
+    )
+    return state
+
+def route_after_grounding(state: AgentState) -> str:
+    return state.get("search_context", {}).get("grounding_route", "review")
+
+REVIEW_STREAMING = True  # 점수 줄을 파싱하는 즉시 통과 여부 판단, 개선이 필요 없으면 생성 중단
+REVIEW_SCORE_PATTERN = re.compile(r"점수\s*[:=]\s*(\d+(?:\.\d+)?)")
+REVIEW_STREAM_SCORE_PATTERN = re.compile(r"점수\s*[:=]\s*(\d+(?:\.\d+)?)\s*(?:/|\(|점|\n)")  # 숫자가 끝난 뒤에만 확정
+
+
+def run_review_llm(report: str, stop_when: Optional[Any] = None) -> Dict[str, Any]:
+    """루브릭 리뷰 LLM 호출. stop_when(score)이 참이면 점수 파싱 직후 스트리밍을 중단"""
     llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    response = llm.invoke(
-        REVIEW_FEW_SHOT_PROMPT.format_messages(
-            baseline_report=REVIEW_BASELINE_REPORT,
-            strong_report=REVIEW_STRONG_REPORT,
-            report=state["final_report"][:4000]
-        )
+    messages = REVIEW_FEW_SHOT_PROMPT.format_messages(
+        baseline_report=REVIEW_BASELINE_REPORT,
+        strong_report=REVIEW_STRONG_REPORT,
+        report=report
     )
+    started = time.perf_counter()
+    early_exit = False
+    if REVIEW_STREAMING and stop_when is not None:
+        parts: List[str] = []
+        stream = llm.stream(messages)
+        try:
+            for chunk in stream:
+                parts.append(chunk.content or "")
+                match = REVIEW_STREAM_SCORE_PATTERN.search("".join(parts))
+                if match and stop_when(max(0.0, min(10.0, float(match.group(1))))):
+                    early_exit = True
+                    break
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()  # 남은 토큰 생성 취소
+        content = "".join(parts).strip()
+    else:
+        content = llm.invoke(messages).content.strip()
+
+    score_match = REVIEW_SCORE_PATTERN.search(content)
+    return {
+        "content": content,
+        "score": max(0.0, min(10.0, float(score_match.group(1)))) if score_match else 7.0,
+        "parsed": bool(score_match),
+        "early_exit": early_exit,
+        "seconds": time.perf_counter() - started,
+        "output_tokens": estimate_tokens(content),
+    }
 
-    content = response.content.strip()
-    score_match = re.search(r"점수\s*[:=]\s*(\d+(?:\.\d+)?)", content)
-    score = float(score_match.group(1)) if score_match else 7.0
-    score = max(0.0, min(10.0, score))
 
-    state.setdefault("search_context", {})
+REVIEW_MODE = os.getenv("REVIEW_MODE", "chunked")  # "single": 앞 4000자만 검토, "chunked": 섹션 묶음별 병렬 검토
+REVIEW_CHUNK_CHARS = 4000  # 검토 묶음 하나의 목표 글자 수 (기존 단일 검토 입력과 동일, 균등 분할 시 약간 넘을 수 있음)
+REVIEW_CONCURRENCY = 6  # 묶음 수 상한: 20k자 보고서는 5개 묶음으로 나뉘어 한 번의 호출 시간 안에 검토
+REVIEW_UNMAPPED_SECTION_CRITERIA = ("A", "B")  # CRITERIA_SECTIONS에 없는 섹션(도전 과제 등)에 적용할 기준
+REVIEW_EXCLUDED_SECTIONS = ("Appendix",)  # 평가 기준 설명 등 검토 대상이 아닌 섹션
+REVIEW_CRITERION_PATTERN = re.compile(r"([A-E])\.\s*([^:\n]+?):\s*(\d+(?:\.\d+)?)\s*/\s*20")
+
+
+def split_report_chunks(report: str, max_chars: int = REVIEW_CHUNK_CHARS, max_chunks: int = REVIEW_CONCURRENCY) -> List[tuple]:
+    """structure_node의 '## ' 섹션 경계로 보고서를 나누고 순서를 유지한 채 비슷한 크기의 묶음으로 합침.
+    묶음 수는 전체 길이 / max_chars (최대 max_chunks, 병렬 검토 한 번에 끝나도록). (섹션 제목 목록, 본문) 반환"""
+    blocks: List[tuple] = []
+    for block in re.split(r"(?m)^(?=## )", report):
+        block = block.strip().rstrip("-").strip()
+        if not block:
+            continue
+        heading = block.split("\n", 1)[0]
+        title = heading[3:].strip() if heading.startswith("## ") else ""
+        if any(excluded in title for excluded in REVIEW_EXCLUDED_SECTIONS):
+            continue
+        blocks.append((title, truncate_text(block, max_chars)))
+    if not blocks:
+        return []
+
+    sizes = [len(text) for _, text in blocks]
+    count = max(1, min(max_chunks, len(blocks), math.ceil(sum(sizes) / max_chars)))
+
+    def groups_needed(capacity: int) -> int:
+        groups, used = 1, 0
+        for size in sizes:
+            if used and used + size > capacity:
+                groups, used = groups + 1, 0
+            used += size
+        return groups
+
+    # 묶음 수가 count 이하가 되는 최소 용량을 이분 탐색 (가장 큰 묶음을 최소화하는 연속 분할)
+    low, high = max(sizes), sum(sizes)
+    while low < high:
+        middle = (low + high) // 2
+        if groups_needed(middle) <= count:
+            high = middle
+        else:
+            low = middle + 1
+
+    chunks: List[tuple] = []
+    titles: List[str] = []
+    parts: List[str] = []
+    used = 0
+    for (title, text), size in zip(blocks, sizes):
+        if parts and used + size > low:
+            chunks.append((titles, "\n\n".join(parts)))
+            titles, parts, used = [], [], 0
+        if title:
+            titles.append(title)
+        parts.append(text)
+        used += size
+    chunks.append((titles, "\n\n".join(parts)))
+    return chunks
+
+
+def chunk_review_criteria(titles: List[str]) -> List[str]:
+    """묶음에 포함된 섹션에 해당하는 평가 기준 (전체 보고서용 기준을 일부 섹션에 적용해 점수가 왜곡되지 않도록)"""
+    normalized = {"".join(title.split()) for title in titles}
+    keys = {key for key, title in REPORT_SECTION_TITLES.items() if "".join(title.split()) in normalized}
+    letters = {letter for letter, sections in CRITERIA_SECTIONS.items() if keys & set(sections)}
+    mapped = {section for sections in CRITERIA_SECTIONS.values() for section in sections}
+    if keys - mapped or not keys:
+        letters.update(REVIEW_UNMAPPED_SECTION_CRITERIA)
+    return sorted(letters)
+
+
+def run_chunked_review(report: str, stop_when: Optional[Any] = None) -> Dict[str, Any]:
+    """섹션 묶음을 병렬 검토하고, 묶음마다 해당하는 기준만 골라 기준별 점수를 묶음 길이 가중 평균으로 집계"""
+    chunks = split_report_chunks(report)
+    if len(chunks) <= 1:
+        return run_review_llm(report[:REVIEW_CHUNK_CHARS], stop_when)
+
+    applicable = [chunk_review_criteria(titles) for titles, _ in chunks]
+
+    def review_chunk(indexed: tuple) -> Dict[str, Any]:
+        index, (titles, text) = indexed
+        note = (
+            f"[부분 검토: 전체 보고서 {len(chunks)}개 묶음 중 {index + 1}번째 - 이 묶음에 포함된 섹션만 평가하세요. "
+            f"해당 기준: {', '.join(applicable[index])} (나머지 기준은 다른 묶음에서 평가)]"
+        )
+        return run_review_llm(f"{note}\n\n{text}", stop_when)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(REVIEW_CONCURRENCY, len(chunks)))) as executor:
+        reviews = list(executor.map(review_chunk, enumerate(chunks)))
+
+    weights = [len(text) for _, text in chunks]
+    criteria: Dict[tuple, List[tuple]] = {}
+    for review, weight, letters in zip(reviews, weights, applicable):
+        values = {}
+        for letter, name, value in REVIEW_CRITERION_PATTERN.findall(review["content"]):
+            if letter in letters and letter not in values:
+                values[letter] = float(value)
+                criteria.setdefault((letter, name.strip()), []).append((float(value), weight))
+        if values:
+            # 묶음 점수는 해당 기준 평균으로 다시 계산 (해당 없는 기준의 낮은 점수가 섞이지 않도록)
+            review["score"] = max(0.0, min(10.0, sum(values.values()) / len(values) / 2))
+        # 해당 없는 기준 줄은 개선 대상 선정(sections_for_feedback)에 쓰이지 않도록 제거
+        review["content"] = "\n".join(
+            line for line in review["content"].split("\n")
+            if not any(match[0] not in letters for match in REVIEW_CRITERION_PATTERN.findall(line))
+        )
+    score = sum(review["score"] * weight for review, weight in zip(reviews, weights)) / sum(weights)
+    lines = [f"점수: {score:.1f}/10 (섹션 묶음 {len(chunks)}개 병렬 검토, 길이 가중 평균)"]
+    if criteria:
+        lines += ["", "세부 평가:"]
+        for (letter, name), values in sorted(criteria.items()):
+            average = sum(value * weight for value, weight in values) / sum(weight for _, weight in values)
+            lines.append(f"- {letter}. {name}: {average:.0f}/20점 (묶음 {len(values)}개 평균)")
+    # 통과 못한 묶음의 상세 평가만 섹션 제목과 함께 남겨 개선 대상 섹션을 특정할 수 있게 함
+    for (titles, _), review in zip(chunks, reviews):
+        if review["score"] < REVIEW_PASS_SCORE:
+            lines += ["", f"[검토 묶음: {', '.join(titles) or '서두'} - {review['score']:.1f}/10]", review["content"]]
+
+    return {
+        "content": "\n".join(lines),
+        "score": max(0.0, min(10.0, score)),
+        "parsed": all(review["parsed"] for review in reviews),
+        "early_exit": all(review["early_exit"] for review in reviews),
+        "seconds": time.perf_counter() - started,
+        "output_tokens": sum(review["output_tokens"] for review in reviews),
+        "chunks": len(chunks),
+    }
+
+
+def refinement_possible(state: AgentState) -> bool:
+    return state.get("refine_count", 0) < MAX_REFINE_ROUNDS
+
+
+def refinement_converged(state: AgentState, score: float) -> bool:
+    """직전 리뷰 대비 개선 폭이 REFINE_MIN_IMPROVEMENT 미만(하락 포함)이면 수렴으로 판단"""
+    history = state.get("score_history") or []
+    return bool(history) and score - history[-1] < REFINE_MIN_IMPROVEMENT
+
+
+def needs_refinement(score: float, ungrounded: bool) -> bool:
+    return score < REVIEW_PASS_SCORE or ungrounded
+
+
+def will_refine(state: AgentState, score: float, ungrounded: bool) -> bool:
+    if not needs_refinement(score, ungrounded):
+        return False
+    return refinement_possible(state) and not refinement_converged(state, score)
+
+
+def review_node(state: AgentState) -> AgentState:
+    """보고서 품질 검토 (보정된 로컬 점수가 확실하면 LLM 리뷰 생략)"""
+    state.setdefault("search_context", {}).pop("review_latency", None)
+    review: Optional[Dict[str, Any]] = None
+    features = report_features(state)
+    local_score = REVIEW_CALIBRATION.predict(features) if PRESCORE_ENABLED else None
+
+    confident = REVIEW_CALIBRATION.is_confident(local_score)
+    audit = confident and random.random() < PRESCORE_AUDIT_RATE
+    if audit:
+        print(f"🎯 로컬 사전 점수 {local_score:.1f}/10 확실하지만 보정 갱신을 위해 LLM 리뷰 실행 (표본 추출 {PRESCORE_AUDIT_RATE:.0%})")
+    if confident and not audit:
+        score = local_score
+        content = format_local_review(score, features, REVIEW_CALIBRATION.rmse)
+        state["search_context"]["review_source"] = "local"
+        print(f"⚡ 로컬 사전 점수 {score:.1f}/10 (±{REVIEW_CALIBRATION.rmse:.1f}) - LLM 리뷰 생략")
+    else:
+        # 통과 점수이고 근거 검증도 문제없으면(또는 더 개선할 수 없으면) 세부 평가는 필요 없음
+        ungrounded = grounding_needs_refinement(state["search_context"].get("grounding", {}))
+        stop_when = lambda score: not will_refine(state, score, ungrounded)
+        if REVIEW_MODE == "chunked":
+            # 묶음 점수는 전체 점수가 아니므로 수렴 판단에 쓰지 않음: 그 묶음이 통과했을 때만 세부 평가 생략
+            chunk_stop_when = lambda score: score >= REVIEW_PASS_SCORE or not refinement_possible(state)
+            review = run_chunked_review(state["final_report"], chunk_stop_when)
+        else:
+            review = run_review_llm(state["final_report"][:4000], stop_when)
+        content, score = review["content"], review["score"]
+        state["search_context"]["review_source"] = "llm"
+        state["search_context"]["review_latency"] = {key: review[key] for key in ("seconds", "output_tokens", "early_exit")}
+        if review["early_exit"]:
+            print(f"⏹️ 리뷰 조기 종료: 점수 {score:.1f} 파싱 후 생성 중단 ({review['seconds']:.1f}초, 출력 약 {review['output_tokens']} 토큰)")
+        if PRESCORE_ENABLED and review["parsed"]:
+            REVIEW_CALIBRATION.add(features, score)  # 다음 실행의 로컬 점수 보정용
+        if local_score is not None:
+            print(f"📏 로컬 사전 점수 {local_score:.1f} vs LLM 리뷰 {score:.1f} (보정 표본 {len(REVIEW_CALIBRATION.samples)}건)")
+
     state["search_context"]["review_feedback"] = content
     state["quality_score"] = score
     state["final_report"] += f"\n\n---\n\n## 보고서 품질 검토 결과\n\n{content}"
     state["final_report"] += f"*보고서 생성일: {__import__('datetime').datetime.now().strftime('%Y년 %m월 %d일')}*\n*생성 시스템: Physical AI Trend Report Generator (Powered by LangGraph + Tavily AI)*"
-    state["messages"].append(f"✅ 품질 검토 완료 (점수: {score:.1f}/10)")
+    state["messages"].append(
+        f"✅ 품질 검토 완료 (점수: {score:.1f}/10, {'로컬 사전 점수' if state['search_context']['review_source'] == 'local' else 'LLM 리뷰'}"
+        f"{', 점수 파싱 후 조기 종료' if state['search_context'].get('review_latency', {}).get('early_exit') else ''}"
+        f"{', 섹션 묶음 ' + str(review['chunks']) + '개 병렬 검토' if review and review.get('chunks') else ''})"
+    )
     state["messages"].append("📝 리뷰 요약 저장")
+
+    # 개선 루프 제어: 점수 이력과 최고 점수 초안을 기록하고 다음 경로를 여기서 결정
+    ungrounded = grounding_needs_refinement(state["search_context"].get("grounding", {}))
+    refine = will_refine(state, score, ungrounded)
+    # 통과하지 못했는데 개선 폭이 작아 멈춘 경우만 수렴으로 기록 (통과한 보고서는 해당 없음)
+    converged = needs_refinement(score, ungrounded) and refinement_possible(state) and refinement_converged(state, score)
+    history = list(state.get("score_history") or [])
+    if converged:
+        print(f"📉 개선 수렴 감지: {history[-1]:.1f} → {score:.1f} (최소 개선 폭 {REFINE_MIN_IMPROVEMENT}) - 개선 중단")
+        state["messages"].append(f"📉 개선 수렴 감지 ({' → '.join(f'{s:.1f}' for s in history + [score])}), 개선 중단")
+    state["score_history"] = history + [score]
+    best = state.get("best_draft") or {}
+    if not best or score > best.get("score", float("-inf")):
+        state["best_draft"] = {
+            "score": score,
+            "final_report": state["final_report"],
+            "report_sections": dict(state["report_sections"]),
+        }
+    state["search_context"]["review_route"] = "refine" if refine else "format"
+    if refine:
+        state["refine_count"] = state.get("refine_count", 0) + 1
     return state
 
 def final_quality_check_node(state: AgentState) -> str:
-    """최종 품질 확인"""
-    if state["quality_score"] < 7.0 and state["iteration_count"] < 2:
-        state["iteration_count"] += 1
-        return "refine"
-    return "format"
+    """최종 품질 확인 (경로는 review_node가 점수 이력과 근거 검증 결과로 결정)"""
+    return state.get("search_context", {}).get("review_route", "format")
 
 def refinement_node(state: AgentState) -> AgentState:
-    """보고서 개선"""
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
+    """보고서 개선: 피드백이 지적한 섹션만 병렬로 다시 생성 (이후 structure_node가 보고서 재조립)"""
+    context = state.setdefault("search_context", {})
 
     # review_feedback 가져오기
-    review_feedback = state.get("search_context", {}).get("review_feedback", "리뷰 피드백 없음")
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """보고서를 개선하세요. 다음에 집중하세요:
-        1. 구체적인 수치 및 데이터 추가
-        2. 실행 가능한 권고사항 강화
-        3. 논리적 흐름 개선
-
-품질 검토 피드백:
-{review_feedback}
-
-위 피드백을 참고하여 지적된 문제점을 개선하세요."""),
-        ("user", "현재 보고서:\n{report}\n\n분석 데이터:\n{data}")
-    ])
-
-    response = llm.invoke(
-        prompt.format_messages(
-            review_feedback=review_feedback,
-            report=state["final_report"][:2000],
-            data=str(state["synthesized_data"])[:1000]
-        )
+    review_feedback = context.get("review_feedback", "리뷰 피드백 없음")
+    grounding_feedback = context.get("grounding_feedback", "")
+    if grounding_feedback and grounding_feedback not in review_feedback:
+        review_feedback = f"{review_feedback}\n\n{grounding_feedback}"
+
+    targets = sections_for_feedback(state, review_feedback)
+    evidence_index = build_evidence_index(state)
+    fact_table = format_fact_table(collect_state_facts(state))
+    sections = dict(state["report_sections"])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(REFINE_CONCURRENCY, len(targets)))) as executor:
+        futures = {
+            section_key: executor.submit(
+                generate_section, section_key, state, evidence_index, fact_table,
+                previous=sections[section_key], feedback=review_feedback,
+            )
+            for section_key in targets
+        }
+        refined = []
+        for section_key, future in futures.items():
+            try:
+                sections[section_key] = future.result()
+                refined.append(section_key)
+            except Exception as exc:
+                print(f"⚠️ {section_key} 섹션 개선 실패, 기존 초안 유지: {exc}")
+    elapsed = time.perf_counter() - started
+
+    # 전체 재작성(섹션 순차 생성) 대비 절감 시간: 초안 생성 때 측정한 섹션별 소요 시간 합계 기준
+    full_rewrite = sum(context.get("section_seconds", {}).values())
+    stats = context.setdefault("refinement_stats", {"rounds": 0, "sections_refined": 0, "seconds_saved": 0.0})
+    stats["rounds"] += 1
+    stats["sections_refined"] += len(refined)
+    stats["seconds_saved"] += max(0.0, full_rewrite - elapsed)
+
+    state["report_sections"] = sections
+    state["messages"].append(
+        f"✅ 보고서 개선 완료 (섹션 {len(refined)}/{len(sections)}개 병렬 재작성: {', '.join(refined) or '없음'}, "
+        f"{elapsed:.1f}초, 전체 재작성 대비 약 {max(0.0, full_rewrite - elapsed):.1f}초 절감)"
     )
-
-    # 개선된 내용으로 업데이트
-    state["final_report"] = response.content
-    state["messages"].append("✅ 보고서 개선 완료")
     return state
 
 def formatting_node(state: AgentState) -> AgentState:
     """최종 포맷팅 및 PDF 생성"""
+    best = state.get("best_draft") or {}
+    if best and best.get("score", float("-inf")) > state["quality_score"]:
+        # 개선 후 점수가 떨어졌다면 마지막 초안 대신 최고 점수 초안을 사용
+        state["messages"].append(f"🏆 최고 점수 초안 복원 ({state['quality_score']:.1f} → {best['score']:.1f})")
+        state["final_report"] = best["final_report"]
+        state["report_sections"] = dict(best["report_sections"])
+        state["quality_score"] = best["score"]
     state["messages"].append("✅ 최종 포맷팅 완료")
+
+    if DOMAIN_LEARNING_ENABLED:
+        feedback = record_domain_feedback(state)
+        SEARCH_STATS.flush()
+        state["messages"].append(f"🏷️ 도메인 품질 갱신: {feedback['domains']}개 도메인 중 보고서 인용 {feedback['cited']}개")
     
     # PDF 생성
     try:
@@ -1576,14 +4166,11 @@ def create_physical_ai_agent():
     
     # 노드 추가
     workflow.add_node("planning", planning_node)
-    workflow.add_node("market_research", market_research_node)
-    workflow.add_node("tech_research", tech_research_node)
-    workflow.add_node("industry_research", industry_research_node)
-    workflow.add_node("company_research", company_research_node)
-    workflow.add_node("challenge_research", challenge_research_node)
+    workflow.add_node("research", research_node)
     workflow.add_node("synthesis", synthesis_node)
     workflow.add_node("report_generation", report_generation_node)
     workflow.add_node("structure", structure_node)
+    workflow.add_node("grounding_check", grounding_check_node)
     workflow.add_node("review", review_node)
     workflow.add_node("refinement", refinement_node)
     workflow.add_node("formatting", formatting_node)
@@ -1591,19 +4178,11 @@ def create_physical_ai_agent():
     # 엣지 추가
     workflow.set_entry_point("planning")
     
-    # Planning -> Research 병렬 실행
-    workflow.add_edge("planning", "market_research")
-    workflow.add_edge("planning", "tech_research")
-    workflow.add_edge("planning", "industry_research")
-    workflow.add_edge("planning", "company_research")
-    workflow.add_edge("planning", "challenge_research")
+    # Planning -> Research (등록된 전체 카테고리를 공유 작업 큐로 병렬 검색)
+    workflow.add_edge("planning", "research")
     
     # Research -> Synthesis
-    workflow.add_edge("market_research", "synthesis")
-    workflow.add_edge("tech_research", "synthesis")
-    workflow.add_edge("industry_research", "synthesis")
-    workflow.add_edge("company_research", "synthesis")
-    workflow.add_edge("challenge_research", "synthesis")
+    workflow.add_edge("research", "synthesis")
     
     # Synthesis -> Quality Check (조건부)
     workflow.add_conditional_edges(
@@ -1618,8 +4197,16 @@ def create_physical_ai_agent():
     # Report Generation -> Structure
     workflow.add_edge("report_generation", "structure")
     
-    # Structure -> Review
-    workflow.add_edge("structure", "review")
+    # Structure -> Grounding Check -> Review (근거가 명백히 부족하면 리뷰 없이 개선)
+    workflow.add_edge("structure", "grounding_check")
+    workflow.add_conditional_edges(
+        "grounding_check",
+        route_after_grounding,
+        {
+            "review": "review",
+            "refine": "refinement"
+        }
+    )
     
     # Review -> Final Check (조건부)
     workflow.add_conditional_edges(
@@ -1659,11 +4246,15 @@ def run_agent(user_query: str):
         "industry_data": [],
         "company_data": [],
         "challenge_data": [],
+        "research_data": {},
         "synthesized_data": {},
         "report_sections": {},
         "final_report": "",
         "quality_score": 0.0,
         "iteration_count": 0,
+        "refine_count": 0,
+        "score_history": [],
+        "best_draft": {},
         "search_context": {},  # Tavily AI 답변 저장
         "messages": []
     }
@@ -1690,13 +4281,21 @@ def run_agent(user_query: str):
     print("\n" + "="*60)
     print("✅ 보고서 생성 완료!")
     print(f"📈 품질 점수: {result['quality_score']}/10")
-    print(f"🔄 반복 횟수: {result['iteration_count']}")
+    print(f"🔄 개선 횟수: {result.get('refine_count', 0)}")
+    if result.get("score_history"):
+        print(f"📉 점수 이력: {' → '.join(f'{s:.1f}' for s in result['score_history'])}")
     print("="*60)
     
     return result
 
 # 실행
 if __name__ == "__main__":
+    if "--benchmark-rerank" in sys.argv:
+        benchmark_reranker()
+        sys.exit(0)
+    if "--check-cache" in sys.argv:
+        sys.exit(0 if check_query_cache() else 1)
+
     # 환경 변수 설정 필요
     # export OPENAI_API_KEY="your-openai-key"
     # export TAVILY_API_KEY="your-tavily-key"